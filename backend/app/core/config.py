@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -10,9 +11,62 @@ class Settings(BaseModel):
     chapters_dirname: str = "chapters"
     questions_dirname: str = "questions"
     config_dirname: str = "config"
+    # Parsed chapters/questions pickled for fast cold starts (scripts/build_content_snapshot.py); None disables.
+    content_snapshot_path: Optional[Path] = data_dir / "content_snapshot.pickle"
+    content_response_cache_entries: int = 2048  # pre-encoded /content responses kept; 0 disables
+    content_response_min_compress: int = 512  # bytes; smaller bodies are not gzip/brotli encoded
+    content_lazy_bodies: bool = False  # keep only question metadata in memory; sections are read on demand
+    content_body_cache_size: int = 512  # question bodies kept in memory when content_lazy_bodies is on
+    content_watch_interval: float = 0.0  # seconds between polls of resources/ for external edits; 0 disables
     default_memory_limit: int = 8 * 1024 * 1024  # 8 MB in bytes
     python_version: str = "3.8"
     max_devices_per_user: int = 3
+    # Warm sandbox pool: 0 keeps the one-interpreter-per-run mode.
+    execution_pool_size: int = 0
+    execution_pool_max_jobs: int = 500  # recycle a pool worker after this many runs
+    execution_max_concurrency: int = 8  # sandboxes running at once (async path)
+    execution_queue_size: int = 32  # requests allowed to wait for a slot before 503
+    execution_retry_after: int = 5  # seconds, sent as Retry-After when the queue is full
+    execution_rate_per_minute: float = 30  # runs each user may start per minute; 0 disables
+    execution_rate_burst: int = 10  # runs a user may start back to back before the rate applies
+    execution_max_batch_cases: int = 20
+    execution_stdout_limit: int = 64 * 1024  # bytes of program stdout kept (head + tail)
+    execution_stderr_limit: int = 16 * 1024
+    execution_trace_memory: bool = False  # also report the tracemalloc peak of user code (slows every run)
+    # Reused, wiped workspaces (tmpfs when available); source is sent over stdin. 0 = mkdtemp per run.
+    execution_workspace_pool_size: int = 0
+    execution_workspace_root: Optional[Path] = None
+    execution_gc_interval: int = 300  # seconds between sweeps for leaked runner-* and dead processes' ws-* dirs; 0 disables
+    execution_gc_max_age: int = 900  # seconds before an unreferenced runner-* dir counts as leaked
+    execution_stream_wall_limit: float = 300.0  # seconds an interactive /execute/stream run may stay open
+    execution_cache_size: int = 1024  # cached run results; 0 disables the cache
+    execution_cache_ttl: int = 600  # seconds
+    execution_cache_persist: bool = False  # mirror cache entries under data_dir/execution_cache
+    judge_model: str = "doubao-seed-1.6-250615"
+    judge_temperature: float = 0.6
+    judge_cache_size: int = 256  # judge responses kept in memory; 0 together with disk entries disables
+    judge_cache_disk_entries: int = 20000  # responses kept in data_dir/judge_cache.sqlite3
+    judge_cache_ttl: int = 7 * 24 * 3600  # seconds
+    judge_cache_path: Path = data_dir / "judge_cache.sqlite3"
+    judge_prompt_token_budget: int = 4000  # estimated tokens of a server-built judge prompt
+    judge_code_token_budget: int = 1500  # share of the budget kept for the submitted code
+    prejudge_time_limit: float = 5.0  # seconds per test case when judging 编程题 locally
+    judge_max_concurrency: int = 4  # synchronous /judge/evaluate calls admitted at once
+    judge_max_inflight: int = 4  # requests open against the remote model, across all callers
+    judge_job_workers: int = 2  # background threads serving queued judge jobs
+    judge_job_queue_size: int = 200  # pending judge jobs before submissions get 503
+    judge_job_retention: int = 3600  # seconds finished judge jobs stay pollable
+    judge_job_path: Path = data_dir / "judge_jobs.sqlite3"
+    judge_queue_size: int = 32
+    judge_retry_after: int = 10
+    judge_rate_per_minute: float = 6  # judge calls each user may make per minute; 0 disables
+    judge_rate_burst: int = 3
+    # "local" runs sandboxes in this process; "queue" hands them to scripts/execution_worker.py.
+    execution_backend: str = "local"
+    execution_queue_path: Path = data_dir / "execution_jobs.sqlite3"
+    execution_queue_poll_interval: float = 0.05  # seconds between job status checks
+    execution_queue_timeout: float = 30.0  # extra seconds a job may wait for a free worker
+    execution_queue_lease: float = 900.0  # seconds before a silent worker's job is handed out again
 
     class Config:
         arbitrary_types_allowed = True
@@ -1,5 +1,9 @@
 from .services.content_service import content_service
 from .services.judge_service import judge_service
+from .services.judge_jobs import judge_jobs
+from .services.judge_prompts import prompt_builder
+from .services.prejudge import prejudge
+from .services.response_cache import content_responses
 from .services.execution_service import execution_service
 from .services.user_service import user_service
 
@@ -8,6 +12,10 @@ def get_content_service():
     return content_service
 
 
+def get_content_responses():
+    return content_responses
+
+
 def get_user_service():
     return user_service
 
@@ -16,6 +24,18 @@ def get_judge_service():
     return judge_service
 
 
+def get_judge_jobs():
+    return judge_jobs
+
+
+def get_prejudge():
+    return prejudge
+
+
+def get_prompt_builder():
+    return prompt_builder
+
+
 
 def get_execution_service():
     return execution_service
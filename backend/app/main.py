@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import settings
+from .dependencies import get_content_service, get_execution_service, get_judge_jobs
 from .routes import admin, auth, content, judge, progress, execute
 
 app = FastAPI(title=settings.project_name)
@@ -12,6 +13,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(auth.router)
@@ -22,6 +24,21 @@ app.include_router(execute.router)
 app.include_router(admin.router)
 
 
+@app.on_event("startup")
+def start_services() -> None:
+    get_execution_service().start()
+    get_judge_jobs().start()
+    get_content_service().warm()
+    get_content_service().start_watcher(settings.content_watch_interval)
+
+
+@app.on_event("shutdown")
+def stop_services() -> None:
+    get_content_service().stop_watcher()
+    get_judge_jobs().shutdown()
+    get_execution_service().shutdown()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
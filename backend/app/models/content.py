@@ -24,6 +24,7 @@ class QuestionMetadata(BaseModel):
     memory_limit: Optional[int] = Field(default=None, description="Bytes")
     show_in_tutorial: bool = True
     show_in_bank: bool = True
+    excerpt: str = ""  # plain-text start of the prompt, so list cards never need the body
 
 
 class Question(BaseModel):
@@ -33,6 +34,7 @@ class Question(BaseModel):
     explanation: Optional[str] = None
     common_mistakes: Optional[str] = None
     advanced_insights: Optional[str] = None
+    test_cases: Optional[str] = None  # "### 测试用例": one fenced stdin block per case
 
 
 class ProgressEntry(BaseModel):
@@ -46,6 +48,7 @@ class DeviceInfo(BaseModel):
     name: str
     browser: str
     last_login: datetime
+    token_hash: Optional[str] = None  # sha256 of the session token issued at login
 
 
 class UserAccount(BaseModel):
@@ -60,3 +63,4 @@ class JudgeResult(BaseModel):
     passed: bool
     feedback_steps: List[str]
     raw_response: Optional[dict] = None
+    cached: bool = False
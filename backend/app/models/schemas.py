@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel
 
@@ -25,6 +25,7 @@ class UserOut(BaseModel):
 
 class AuthResponse(BaseModel):
     user: UserOut
+    token: str | None = None  # session token from /auth/login, sent back as "Authorization: Bearer ..."
 
 
 class RegisterRequest(BaseModel):
@@ -52,13 +53,39 @@ class ProgressRequest(BaseModel):
 
 
 class JudgeRequest(BaseModel):
-    system_prompt: str
-    prompt: str
+    # Either a stored question plus the code, assembled server-side, or a full prompt pair.
+    question_slug: str | None = None
+    code: str | None = None
+    system_prompt: str | None = None
+    prompt: str | None = None
 
 
 class JudgeResponse(BaseModel):
     passed: bool
     feedback_steps: List[str]
+    cached: bool = False
+    source: str = "llm"  # "local" when the verdict came from the pre-judge
+    verdict: str | None = None  # batch verdict for locally judged 编程题
+
+
+class JudgeSubmission(BaseModel):
+    question_slug: str
+    answer: str  # code for 编程题, the chosen option for 判断题/单选题
+
+
+class JudgeJobOut(BaseModel):
+    job_id: str
+    status: str  # pending / running / done / failed
+    result: JudgeResponse | None = None
+    error: str | None = None
+
+
+class JudgeJobStats(BaseModel):
+    workers: int
+    pending: int
+    running: int
+    done: int
+    failed: int
 
 
 class ExecutionRequest(BaseModel):
@@ -68,11 +95,128 @@ class ExecutionRequest(BaseModel):
     memory_limit: int | None = None
 
 
+class ResourceUsage(BaseModel):
+    wall_time_ms: float | None = None
+    cpu_user_ms: float | None = None
+    cpu_sys_ms: float | None = None
+    max_rss_kb: int | None = None  # whole sandbox process, interpreter included
+    peak_traced_bytes: int | None = None  # tracemalloc peak of the user code
+    memory_limit: int | None = None
+    memory_limit_exceeded: bool = False
+
+
 class ExecutionResult(BaseModel):
     success: bool
     stdout: str
     stderr: str
     error: str | None = None
+    truncated: bool = False
+    stdout_bytes: int | None = None  # size before truncation
+    stderr_bytes: int | None = None
+    usage: ResourceUsage | None = None
+    queue_wait_ms: float | None = None
+    cached: bool = False
+
+
+class ExecutionCase(BaseModel):
+    stdin: str | None = None
+    expected_stdout: str | None = None
+
+
+class BatchExecutionRequest(BaseModel):
+    code: str
+    cases: List[ExecutionCase]
+    time_limit: float | None = None
+    memory_limit: int | None = None
+
+
+class CaseResult(BaseModel):
+    index: int
+    status: str  # accepted / wrong_answer / runtime_error / time_limit_exceeded / completed
+    success: bool
+    stdout: str = ""
+    stderr: str = ""
+    error: str | None = None
+    truncated: bool = False
+    usage: ResourceUsage | None = None
+
+
+class BatchExecutionResult(BaseModel):
+    verdict: str  # worst case status, or compile_error
+    passed: int
+    total: int
+    compile_error: str | None = None
+    cases: List[CaseResult]
+    queue_wait_ms: float | None = None
+    cached: bool = False
+
+
+class ExecutionCacheStats(BaseModel):
+    enabled: bool
+    entries: int
+    inflight: int
+    hits: int
+    misses: int
+    shared: int
+    hit_rate: float
+
+
+class ContentResponseCacheStats(BaseModel):
+    entries: int
+    hits: int
+    misses: int
+    not_modified: int
+    hit_rate: float
+    brotli: bool
+
+
+class JudgeCacheStats(BaseModel):
+    enabled: bool
+    memory_entries: int
+    disk_entries: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    hit_rate: float
+
+
+class HistogramBucket(BaseModel):
+    le: float | None  # None is the +Inf bucket
+    count: int
+
+
+class HistogramOut(BaseModel):
+    count: int
+    sum: float
+    mean: float | None = None
+    max: float | None = None
+    p50: float | None = None
+    p95: float | None = None
+    p99: float | None = None
+    buckets: List[HistogramBucket]
+
+
+class SearchHitOut(BaseModel):
+    kind: str  # "chapter" or "question"
+    slug: str
+    title: str
+    score: float
+    snippet: str
+    highlights: List[List[int]]  # [start, end) character offsets into snippet
+
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    offset: int
+    limit: int
+    hits: List[SearchHitOut]
+
+
+class ContentDuplicates(BaseModel):
+    # slug -> files defining it, relative to resources/; the first one is served
+    chapters: Dict[str, List[str]]
+    questions: Dict[str, List[str]]
 
 
 class ChapterOut(BaseModel):
@@ -121,3 +265,24 @@ class QuestionUpsertRequest(BaseModel):
     explanation: str | None = None
     common_mistakes: str | None = None
     advanced_insights: str | None = None
+    test_cases: str | None = None  # None keeps the cases already declared in the file
+
+
+class SchedulerUserStats(BaseModel):
+    submitted: int
+    admitted: int
+    rate_limited: int
+    rejected: int
+    running: int
+    waiting: int
+
+
+class SchedulerStats(BaseModel):
+    running: int
+    waiting: int
+    max_concurrency: int
+    queue_size: int
+    rate_per_minute: float
+    burst: int
+    backend_pending: int | None = None  # jobs waiting for an execution worker (queue backend)
+    users: Dict[str, SchedulerUserStats]
@@ -1,19 +1,38 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
-from ..dependencies import get_content_service, get_user_service
+from ..dependencies import (
+    get_content_responses,
+    get_content_service,
+    get_execution_service,
+    get_judge_jobs,
+    get_judge_service,
+    get_user_service,
+)
 from ..models.schemas import (
     ChapterOut,
     ChapterUpsertRequest,
+    ContentDuplicates,
+    ContentResponseCacheStats,
+    ExecutionCacheStats,
+    HistogramOut,
+    JudgeCacheStats,
+    JudgeJobStats,
     QuestionOut,
     QuestionUpsertRequest,
+    SchedulerStats,
     UserOut,
 )
 from ..services.content_service import ContentService
+from ..services.execution_service import ExecutionService
+from ..services.judge_jobs import JudgeJobService
+from ..services.judge_service import LLMJudge
+from ..services.metrics import metrics
+from ..services.response_cache import ResponseCache
 from ..services.user_service import UserService
 from .auth import _to_user_out
-from .content import _question_out
+from .content import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, _question_out, _question_page
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -32,8 +51,14 @@ def get_user(username: str, service: UserService = Depends(get_user_service)):
 
 
 @router.get("/questions", response_model=list[QuestionOut])
-def list_all_questions(service: ContentService = Depends(get_content_service)):
-    return [_question_out(q) for q in service.list_questions()]
+def list_all_questions(
+    response: Response,
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(default=None, description="summary, or a comma-separated list of fields"),
+    service: ContentService = Depends(get_content_service),
+):
+    return _question_page(service, response, cursor=cursor, limit=limit, fields=fields)
 
 
 @router.post("/chapters", response_model=ChapterOut, status_code=status.HTTP_201_CREATED)
@@ -70,5 +95,61 @@ def upsert_question(payload: QuestionUpsertRequest, service: ContentService = De
         explanation=payload.explanation,
         common_mistakes=payload.common_mistakes,
         advanced_insights=payload.advanced_insights,
+        test_cases=payload.test_cases,
     )
     return _question_out(question)
+
+
+@router.delete("/chapters/{slug}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_chapter(slug: str, service: ContentService = Depends(get_content_service)):
+    if not service.delete_chapter(slug):
+        raise HTTPException(status_code=404, detail="未找到章节")
+
+
+@router.delete("/questions/{slug}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_question(slug: str, service: ContentService = Depends(get_content_service)):
+    if not service.delete_question(slug):
+        raise HTTPException(status_code=404, detail="未找到题目")
+
+
+@router.get("/content/duplicates", response_model=ContentDuplicates)
+def content_duplicates(service: ContentService = Depends(get_content_service)):
+    return ContentDuplicates(**service.duplicate_slugs())
+
+
+@router.get("/content/cache", response_model=ContentResponseCacheStats)
+def content_cache_stats(cache: ResponseCache = Depends(get_content_responses)):
+    return ContentResponseCacheStats(**cache.stats())
+
+
+@router.get("/execution/cache", response_model=ExecutionCacheStats)
+def execution_cache_stats(service: ExecutionService = Depends(get_execution_service)):
+    return ExecutionCacheStats(**service.cache_stats())
+
+
+@router.get("/execution/metrics", response_model=dict[str, HistogramOut])
+def execution_metrics():
+    return {name: value for name, value in metrics.snapshot().items() if name.startswith("execution.")}
+
+
+@router.get("/judge/cache", response_model=JudgeCacheStats)
+def judge_cache_stats(service: LLMJudge = Depends(get_judge_service)):
+    return JudgeCacheStats(**service.cache_stats())
+
+
+@router.get("/judge/metrics", response_model=dict[str, HistogramOut])
+def judge_metrics():
+    return {name: value for name, value in metrics.snapshot().items() if name.startswith("judge.")}
+
+
+@router.get("/judge/jobs", response_model=JudgeJobStats)
+def judge_job_stats(jobs: JudgeJobService = Depends(get_judge_jobs)):
+    return JudgeJobStats(**jobs.stats())
+
+
+@router.get("/scheduler", response_model=dict[str, SchedulerStats])
+async def scheduler_stats(
+    execution: ExecutionService = Depends(get_execution_service),
+    judge: LLMJudge = Depends(get_judge_service),
+):
+    return {"execution": execution.scheduler_stats(), "judge": judge.scheduler_stats()}
@@ -46,8 +46,8 @@ def register(req: RegisterRequest, service: UserService = Depends(get_user_servi
 def login(req: LoginRequest, service: UserService = Depends(get_user_service)):
     account = service.authenticate(req.username, req.password)
     device = DeviceInfo(name=req.device_name, browser=req.browser, last_login=datetime.utcnow())
-    account = service.register_device(req.username, device)
-    return AuthResponse(user=_to_user_out(account))
+    account, token = service.start_session(req.username, device)
+    return AuthResponse(user=_to_user_out(account), token=token)
 
 
 @router.delete("/device", response_model=AuthResponse)
@@ -1,59 +1,187 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import binascii
+from typing import Any, Dict, Optional, Sequence, Tuple
 
-from ..dependencies import get_content_service
-from ..models.schemas import ChapterOut, QuestionOut
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from ..dependencies import get_content_responses, get_content_service
+from ..models.content import Chapter, Question, QuestionMetadata
+from ..models.schemas import ChapterOut, QuestionOut, SearchHitOut, SearchResults
 from ..services.content_service import ContentService
+from ..services.response_cache import ResponseCache
 
 router = APIRouter(prefix="/content", tags=["content"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# fields=summary: what the bank list needs to render a card.
+SUMMARY_FIELDS = ("slug", "chapter", "difficulty", "type", "title", "excerpt")
+QUESTION_FIELDS = frozenset(QuestionOut.__fields__) | {"excerpt"}
+# Stored with the metadata, so projecting only these never reads a question body.
+_META_FIELDS = frozenset(QuestionMetadata.__fields__)
+
 
 @router.get("/chapters", response_model=list[ChapterOut])
-def list_chapters(service: ContentService = Depends(get_content_service)):
-    chapters = service.list_chapters()
-    return [
-        ChapterOut(
-            slug=chapter.meta.slug,
-            title=chapter.meta.title,
-            order=chapter.meta.order,
-            description=chapter.meta.description,
-            body=chapter.body,
-        )
-        for chapter in chapters
-    ]
+def list_chapters(
+    request: Request,
+    service: ContentService = Depends(get_content_service),
+    cache: ResponseCache = Depends(get_content_responses),
+):
+    return cache.respond(
+        request, ("chapters",), lambda: [_chapter_out(chapter).dict() for chapter in service.list_chapters()]
+    )
 
 
 @router.get("/chapters/{slug}", response_model=ChapterOut)
-def get_chapter(slug: str, service: ContentService = Depends(get_content_service)):
-    chapter = service.get_chapter(slug)
-    if not chapter:
-        raise HTTPException(status_code=404, detail="未找到章节")
-    return ChapterOut(
-        slug=chapter.meta.slug,
-        title=chapter.meta.title,
-        order=chapter.meta.order,
-        description=chapter.meta.description,
-        body=chapter.body,
-    )
+def get_chapter(
+    slug: str,
+    request: Request,
+    service: ContentService = Depends(get_content_service),
+    cache: ResponseCache = Depends(get_content_responses),
+):
+    def build() -> Dict[str, Any]:
+        chapter = service.get_chapter(slug)
+        if not chapter:
+            raise HTTPException(status_code=404, detail="未找到章节")
+        return _chapter_out(chapter).dict()
+
+    return cache.respond(request, ("chapter", slug), build)
 
 
 @router.get("/questions", response_model=list[QuestionOut])
 def list_questions(
+    response: Response,
     chapter: str | None = Query(default=None),
     difficulty: str | None = Query(default=None),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(default=None, description="summary, or a comma-separated list of fields"),
     service: ContentService = Depends(get_content_service),
 ):
-    questions = service.list_questions(chapter=chapter, difficulty=difficulty)
-    return [_question_out(q) for q in questions]
+    return _question_page(
+        service, response, chapter=chapter, difficulty=difficulty, cursor=cursor, limit=limit, fields=fields
+    )
+
+
+@router.get("/search", response_model=SearchResults)
+def search_content(
+    q: str = Query(min_length=1, max_length=200),
+    kind: str | None = Query(default=None, pattern="^(chapter|question)$"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    service: ContentService = Depends(get_content_service),
+):
+    total, hits = service.search(q, kind=kind, limit=limit, offset=offset)
+    return SearchResults(
+        query=q,
+        total=total,
+        offset=offset,
+        limit=limit,
+        hits=[
+            SearchHitOut(
+                kind=hit.kind,
+                slug=hit.slug,
+                title=hit.title,
+                score=hit.score,
+                snippet=hit.snippet,
+                highlights=[list(span) for span in hit.highlights],
+            )
+            for hit in hits
+        ],
+    )
 
 
 @router.get("/questions/{slug}", response_model=QuestionOut)
-def get_question(slug: str, service: ContentService = Depends(get_content_service)):
-    question = service.get_question(slug)
-    if not question:
-        raise HTTPException(status_code=404, detail="未找到题目")
-    return _question_out(question)
+def get_question(
+    slug: str,
+    request: Request,
+    service: ContentService = Depends(get_content_service),
+    cache: ResponseCache = Depends(get_content_responses),
+):
+    def build() -> Dict[str, Any]:
+        question = service.get_question(slug)
+        if not question:
+            raise HTTPException(status_code=404, detail="未找到题目")
+        return _question_out(question).dict()
+
+    return cache.respond(request, ("question", slug), build)
+
+
+def _question_page(
+    service: ContentService,
+    response: Response,
+    *,
+    chapter: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+):
+    """A page of questions; the cursor for the next one goes in ``X-Next-Cursor``.
+
+    With ``fields`` only those keys are serialized, skipping model validation.
+    """
+    selected = _parse_fields(fields)
+    questions, next_after = service.page_questions(
+        chapter=chapter, difficulty=difficulty, after=_decode_cursor(cursor), limit=limit
+    )
+    headers = {NEXT_CURSOR_HEADER: _encode_cursor(next_after)} if next_after is not None else {}
+    if selected is None or not _META_FIELDS.issuperset(selected):
+        questions = [service.hydrate(q) for q in questions]
+    if selected is None:
+        response.headers.update(headers)
+        return [_question_out(q) for q in questions]
+    return JSONResponse([_project(q, selected) for q in questions], headers=headers)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+    if fields == "summary":
+        return SUMMARY_FIELDS
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in QUESTION_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"未知字段：{', '.join(unknown)}")
+    return names
+
+
+def _project(question: Question, names: Sequence[str]) -> Dict[str, Any]:
+    projected: Dict[str, Any] = {}
+    for name in names:
+        if name in _META_FIELDS:
+            projected[name] = getattr(question.meta, name)
+        else:
+            projected[name] = getattr(question, name)
+    return projected
+
+
+def _encode_cursor(slug: str) -> str:
+    return base64.urlsafe_b64encode(slug.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True)
+        return raw.decode("utf-8")
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="无效的分页游标") from None
+
+
+def _chapter_out(chapter: Chapter) -> ChapterOut:
+    return ChapterOut(
+        slug=chapter.meta.slug,
+        title=chapter.meta.title,
+        order=chapter.meta.order,
+        description=chapter.meta.description,
+        body=chapter.body,
+    )
 
 
 def _question_out(question) -> QuestionOut:
@@ -1,18 +1,129 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import contextlib
+from typing import Optional, Tuple
 
-from ..dependencies import get_execution_service
-from ..models.schemas import ExecutionRequest, ExecutionResult
-from ..services.execution_service import ExecutionService
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.requests import HTTPConnection
+
+from ..dependencies import get_execution_service, get_user_service
+from ..models.schemas import BatchExecutionRequest, BatchExecutionResult, ExecutionRequest, ExecutionResult
+from ..services.execution_service import ExecutionService, ExecutionStream
+from ..services.user_service import UserService
 
 router = APIRouter(prefix="/execute", tags=["execute"])
 
 
+def _caller(connection: HTTPConnection, users: UserService) -> Tuple[str, bool]:
+    """Scheduler identity: the session's account (admins get priority) or the client IP.
+
+    The session token comes from ``Authorization: Bearer``; WebSocket clients,
+    which cannot set headers from a browser, may pass ``?token=`` instead.
+    """
+    token = _session_token(connection)
+    identity = users.session_identity(token) if token else None
+    if identity:
+        return identity
+    host = connection.client.host if connection.client else "unknown"
+    return f"ip:{host}", False
+
+
+def _session_token(connection: HTTPConnection) -> Optional[str]:
+    scheme, _, token = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return token.strip()
+    if connection.scope["type"] == "websocket":
+        return connection.query_params.get("token")
+    return None
+
+
 @router.post("/run", response_model=ExecutionResult)
-def run_code(req: ExecutionRequest, service: ExecutionService = Depends(get_execution_service)):
-    result = service.run(
+async def run_code(
+    req: ExecutionRequest,
+    request: Request,
+    service: ExecutionService = Depends(get_execution_service),
+    users: UserService = Depends(get_user_service),
+):
+    user, priority = _caller(request, users)
+    result = await service.run_async(
         req.code,
         stdin_data=req.stdin,
         time_limit=req.time_limit or 30.0,
         memory_limit=req.memory_limit,
+        user=user,
+        priority=priority,
     )
     return result
+
+
+@router.post("/batch", response_model=BatchExecutionResult)
+async def run_batch(
+    req: BatchExecutionRequest,
+    request: Request,
+    service: ExecutionService = Depends(get_execution_service),
+    users: UserService = Depends(get_user_service),
+):
+    user, priority = _caller(request, users)
+    return await service.run_batch_async(
+        req.code,
+        req.cases,
+        time_limit=req.time_limit or 30.0,
+        memory_limit=req.memory_limit,
+        user=user,
+        priority=priority,
+    )
+
+
+@router.websocket("/stream")
+async def stream_code(
+    websocket: WebSocket,
+    service: ExecutionService = Depends(get_execution_service),
+    users: UserService = Depends(get_user_service),
+):
+    """Interactive run over WebSocket.
+
+    The first client message is an ``ExecutionRequest``; afterwards the client
+    may send ``{"type": "stdin", "data": ...}`` and ``{"type": "eof"}``. The
+    server sends ``stdout``/``stderr`` frames and ends with an ``exit`` frame.
+    """
+    await websocket.accept()
+    try:
+        req = ExecutionRequest(**await websocket.receive_json())
+        user, priority = _caller(websocket, users)
+        async with service.open_stream(
+            req.code,
+            time_limit=req.time_limit or 30.0,
+            memory_limit=req.memory_limit,
+            user=user,
+            priority=priority,
+        ) as stream:
+            if req.stdin:
+                await stream.send_stdin(req.stdin)
+            pump = asyncio.create_task(_pump_stdin(websocket, stream))
+            try:
+                async for frame in stream.frames():
+                    await websocket.send_json(frame)
+            finally:
+                pump.cancel()
+                with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect):
+                    await pump
+    except WebSocketDisconnect:
+        return
+    except ValidationError as exc:
+        await websocket.send_json({"type": "error", "status": 422, "detail": exc.errors()})
+    except HTTPException as exc:
+        await websocket.send_json({"type": "error", "status": exc.status_code, "detail": exc.detail})
+    await websocket.close()
+
+
+async def _pump_stdin(websocket: WebSocket, stream: ExecutionStream) -> None:
+    while True:
+        try:
+            message = await websocket.receive_json()
+        except WebSocketDisconnect:
+            await stream.terminate()
+            raise
+        if message.get("type") == "stdin":
+            await stream.send_stdin(str(message.get("data", "")))
+        elif message.get("type") == "eof":
+            stream.close_stdin()
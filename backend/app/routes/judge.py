@@ -1,13 +1,141 @@
-from fastapi import APIRouter, Depends
+import json
+from typing import Any, AsyncIterator, Dict, Tuple, Union
 
-from ..dependencies import get_judge_service
-from ..models.schemas import JudgeRequest, JudgeResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from ..dependencies import get_judge_jobs, get_judge_service, get_prejudge, get_prompt_builder, get_user_service
+from ..models.schemas import JudgeJobOut, JudgeRequest, JudgeResponse, JudgeSubmission
+from ..services.job_queue import DONE, Job
+from ..services.judge_jobs import JudgeJobService
+from ..services.judge_prompts import PromptBuilder
 from ..services.judge_service import LLMJudge
+from ..services.prejudge import PreJudge
+from ..services.user_service import UserService
+from .execute import _caller
 
 router = APIRouter(prefix="/judge", tags=["judge"])
 
 
-@router.post("/evaluate", response_model=JudgeResponse)
-def evaluate(req: JudgeRequest, service: LLMJudge = Depends(get_judge_service)):
-    result = service.evaluate(req.system_prompt, req.prompt)
-    return JudgeResponse(passed=result.passed, feedback_steps=result.feedback_steps)
+async def _event_stream(frames: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Serve judge frames as server-sent events.
+
+    The first frame is awaited before responding so that quota, queue and
+    lookup errors still surface as plain HTTP errors.
+    """
+    first = await frames.__anext__()
+
+    async def body() -> AsyncIterator[str]:
+        yield _sse(first)
+        try:
+            async for frame in frames:
+                yield _sse(frame)
+        except HTTPException as exc:
+            yield _sse({"type": "error", "status": exc.status_code, "detail": exc.detail})
+
+    return StreamingResponse(
+        body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(frame: Dict[str, Any]) -> str:
+    return f"event: {frame['type']}\ndata: {json.dumps(frame, ensure_ascii=False)}\n\n"
+
+
+def _prompts(req: JudgeRequest, builder: PromptBuilder) -> Tuple[str, str]:
+    """Server-built prompts for ``question_slug`` + ``code``, else the pair sent by the client."""
+    if req.question_slug:
+        if not req.code or not req.code.strip():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="代码不能为空")
+        return builder.build(req.question_slug, req.code)
+    if req.system_prompt is None or req.prompt is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="请提供 question_slug 与 code")
+    return req.system_prompt, req.prompt
+
+
+def _job_out(job: Job) -> JudgeJobOut:
+    result = JudgeResponse(**job.result) if job.status == DONE and job.result else None
+    return JudgeJobOut(job_id=job.id, status=job.status, result=result, error=job.error)
+
+
+@router.post("/evaluate", response_model=Union[JudgeResponse, JudgeJobOut])
+async def evaluate(
+    req: JudgeRequest,
+    request: Request,
+    response: Response,
+    background: bool = False,
+    service: LLMJudge = Depends(get_judge_service),
+    jobs: JudgeJobService = Depends(get_judge_jobs),
+    builder: PromptBuilder = Depends(get_prompt_builder),
+    users: UserService = Depends(get_user_service),
+):
+    """Judge a submission; with ``background=true`` answer 202 and a job to poll instead."""
+    system_prompt, prompt = _prompts(req, builder)
+    user, priority = _caller(request, users)
+    if background:
+        service.charge(user, priority=priority)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return _job_out(jobs.submit(system_prompt, prompt, user=user))
+    result = await service.evaluate_async(system_prompt, prompt, user=user, priority=priority)
+    return JudgeResponse(passed=result.passed, feedback_steps=result.feedback_steps, cached=result.cached)
+
+
+@router.post("/submit", response_model=JudgeResponse)
+async def submit_answer(
+    req: JudgeSubmission,
+    request: Request,
+    service: PreJudge = Depends(get_prejudge),
+    users: UserService = Depends(get_user_service),
+):
+    """Judge an answer to a stored question, locally when possible."""
+    user, priority = _caller(request, users)
+    return await service.judge(req.question_slug, req.answer, user=user, priority=priority)
+
+
+@router.post("/stream")
+async def evaluate_stream(
+    req: JudgeRequest,
+    request: Request,
+    service: LLMJudge = Depends(get_judge_service),
+    builder: PromptBuilder = Depends(get_prompt_builder),
+    users: UserService = Depends(get_user_service),
+):
+    """SSE variant of ``/evaluate``: ``start``, one ``step`` per feedback line, then ``done``."""
+    system_prompt, prompt = _prompts(req, builder)
+    user, priority = _caller(request, users)
+    return await _event_stream(service.stream_async(system_prompt, prompt, user=user, priority=priority))
+
+
+@router.post("/submit/stream")
+async def submit_answer_stream(
+    req: JudgeSubmission,
+    request: Request,
+    service: PreJudge = Depends(get_prejudge),
+    users: UserService = Depends(get_user_service),
+):
+    user, priority = _caller(request, users)
+    return await _event_stream(service.judge_stream(req.question_slug, req.answer, user=user, priority=priority))
+
+
+@router.post("/jobs", response_model=JudgeJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    req: JudgeRequest,
+    request: Request,
+    service: LLMJudge = Depends(get_judge_service),
+    jobs: JudgeJobService = Depends(get_judge_jobs),
+    builder: PromptBuilder = Depends(get_prompt_builder),
+    users: UserService = Depends(get_user_service),
+):
+    system_prompt, prompt = _prompts(req, builder)
+    user, priority = _caller(request, users)
+    service.charge(user, priority=priority)
+    return _job_out(jobs.submit(system_prompt, prompt, user=user))
+
+
+@router.get("/jobs/{job_id}", response_model=JudgeJobOut)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for the job to finish"),
+    jobs: JudgeJobService = Depends(get_judge_jobs),
+):
+    return _job_out(await jobs.wait(job_id, wait))
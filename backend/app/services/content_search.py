@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+_WORD = re.compile(r"[a-z0-9_]+")
+_CJK = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]+")
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str, *, query: bool = False) -> List[str]:
+    """Index terms of ``text``: ASCII words plus CJK unigrams and bigrams.
+
+    Snake-case identifiers also yield their parts, so ``max_value`` matches
+    ``max``. Queries skip CJK unigrams unless a run is a single character,
+    which keeps multi-character queries from matching every shared character.
+    """
+    text = text.lower()
+    terms: List[str] = []
+    for word in _WORD.findall(text):
+        terms.append(word)
+        if "_" in word:
+            terms.extend(part for part in word.split("_") if part)
+    for run in _CJK.findall(text):
+        if not query or len(run) == 1:
+            terms.extend(run)
+        terms.extend(run[index:index + 2] for index in range(len(run) - 1))
+    return terms
+
+
+@dataclass
+class Document:
+    kind: str  # "chapter" or "question"
+    slug: str
+    title: str
+    fields: List[Tuple[str, float]]  # (text, weight); the snippet comes from the first field that matches
+    # When set, ``fields`` are dropped after indexing and fetched again for snippets.
+    reload: Optional[Callable[[], List[Tuple[str, float]]]] = None
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    slug: str
+    title: str
+    score: float
+    snippet: str
+    highlights: List[Tuple[int, int]]  # [start, end) offsets into ``snippet``
+
+
+class SearchIndex:
+    """Inverted index over chapters and questions, ranked with BM25.
+
+    Term frequencies are summed across fields with per-field weights, so a
+    title hit counts more than one deep in the explanation. Documents are
+    added and removed one at a time as content changes.
+    """
+
+    def __init__(self) -> None:
+        self._docs: Dict[str, Document] = {}
+        self._lengths: Dict[str, float] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc: Document) -> None:
+        key = f"{doc.kind}:{doc.slug}"
+        weighted: Counter = Counter()
+        for text, weight in doc.fields:
+            for term in tokenize(text):
+                weighted[term] += weight
+        with self._lock:
+            self._remove(key)
+            self._docs[key] = replace(doc, fields=[]) if doc.reload is not None else doc
+            self._lengths[key] = sum(weighted.values())
+            self._total_length += self._lengths[key]
+            self._terms[key] = list(weighted)
+            for term, frequency in weighted.items():
+                self._postings.setdefault(term, {})[key] = frequency
+
+    def remove(self, kind: str, slug: str) -> None:
+        with self._lock:
+            self._remove(f"{kind}:{slug}")
+
+    def search(
+        self, query: str, *, kind: Optional[str] = None, limit: int = 20, offset: int = 0
+    ) -> Tuple[int, List[SearchHit]]:
+        """Return the total number of matches and one page of hits, best first."""
+        terms = list(dict.fromkeys(tokenize(query, query=True)))
+        if not terms:
+            return 0, []
+        with self._lock:
+            scores = self._score(terms, kind)
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            page = [(self._docs[key], score) for key, score in ranked[offset:offset + limit]]
+        hits = []
+        for doc, score in page:
+            snippet, highlights = make_snippet(_snippet_source(doc, terms), terms)
+            hits.append(SearchHit(doc.kind, doc.slug, doc.title, round(score, 4), snippet, highlights))
+        return len(ranked), hits
+
+    # Internal helpers ----------------------------------------------------
+    def _score(self, terms: Iterable[str], kind: Optional[str]) -> Dict[str, float]:
+        count = len(self._docs)
+        average = self._total_length / count if count else 0.0
+        scores: Dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                if kind and self._docs[key].kind != kind:
+                    continue
+                norm = K1 * (1 - B + B * self._lengths[key] / average) if average else K1
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+        return scores
+
+    def _remove(self, key: str) -> None:
+        if key not in self._docs:
+            return
+        for term in self._terms.pop(key, []):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(key, 0.0)
+        del self._docs[key]
+
+
+def _snippet_source(doc: Document, terms: List[str]) -> str:
+    fields = doc.reload() if doc.reload is not None else doc.fields
+    for text, _ in fields:
+        lowered = text.lower()
+        if any(term in lowered for term in terms):
+            return text
+    return fields[0][0] if fields else ""
+
+
+def make_snippet(text: str, terms: List[str], *, width: int = 120) -> Tuple[str, List[Tuple[int, int]]]:
+    """Window of ``text`` around the first query term, with match offsets to highlight."""
+    text = " ".join(text.split())
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    start = max(min(positions) - width // 4, 0) if positions else 0
+    end = min(start + width, len(text))
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    window = lowered[start:end]
+    spans: List[Tuple[int, int]] = []
+    for term in terms:
+        pos = window.find(term)
+        while pos >= 0:
+            spans.append((pos + len(prefix), pos + len(prefix) + len(term)))
+            pos = window.find(term, pos + 1)
+    merged: List[Tuple[int, int]] = []
+    for span in sorted(spans):
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], span[1]))
+        else:
+            merged.append(span)
+    return prefix + text[start:end] + suffix, merged
@@ -1,29 +1,412 @@
 from __future__ import annotations
 
+import bisect
+import os
+import pickle
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 import yaml
 
 from ..core.config import settings
 from ..models.content import Chapter, ChapterMetadata, Question, QuestionMetadata
-from ..utils.frontmatter import parse
+from ..utils.frontmatter import parse, parse_sections, read_body, read_front_matter, split_sections
+from .content_search import Document, SearchHit, SearchIndex
+
+T = TypeVar("T", Chapter, Question)
+# (st_mtime_ns, st_size): a file whose stamp is unchanged is not parsed again.
+Stamp = Tuple[int, int]
+# Bump when parsing changes, so snapshots written by older code are ignored.
+SNAPSHOT_FORMAT = 2
+EXCERPT_LENGTH = 90
+# Lazy loading reads only this much of a body to build the excerpt.
+EXCERPT_BYTES = 2048
+# Heading and code-fence lines are dropped; quote and list markers only at the start of a line.
+_EXCERPT_SKIP = re.compile(r"^\s{0,3}(#{1,6}\s|#{1,6}$|```|~~~)")
+_EXCERPT_LEAD = re.compile(r"^\s*(>\s*)*([-*+]\s+|\d+[.)]\s+)?")
+_EXCERPT_CODE = re.compile(r"`+")
+_EXCERPT_EMPHASIS = re.compile(r"(\*{1,3})(\S(?:[^*]*?\S)?)\1")
+# ``###`` headings of a question body and the Question fields they fill.
+SECTION_HEADINGS = {
+    "正确答案": "answer",
+    "解析": "explanation",
+    "常见错误": "common_mistakes",
+    "进阶拓展": "advanced_insights",
+    "测试用例": "test_cases",
+}
+
+
+def make_excerpt(prompt: str, length: int = EXCERPT_LENGTH) -> str:
+    """The prompt as one line of plain text, cut to ``length`` characters."""
+    lines = (_EXCERPT_LEAD.sub("", line, count=1) for line in prompt.splitlines() if not _EXCERPT_SKIP.match(line))
+    text = _EXCERPT_EMPHASIS.sub(r"\2", _EXCERPT_CODE.sub("", " ".join(lines)))
+    clean = " ".join(text.split())
+    return clean[:length] + ("…" if len(clean) > length else "")
+
+
+def _stamp(path: Path) -> Stamp:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _schema() -> Dict[str, List[str]]:
+    models = (Chapter, ChapterMetadata, Question, QuestionMetadata)
+    return {model.__name__: sorted(model.__fields__) for model in models}
+
+
+class ContentIndex(Generic[T]):
+    """Parsed entries of one content kind, indexed by file and by slug.
+
+    ``files`` maps every Markdown file seen to its stamp and parsed entry;
+    ``paths`` maps each slug to the files defining it, in path order. The
+    first file wins and the others are reported by :meth:`duplicates`.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Path], Optional[T]],
+        on_change: Optional[Callable[[str, Optional[T]], None]] = None,
+    ) -> None:
+        self.loader = loader
+        self.on_change = on_change  # called with (slug, entry or None) whenever a served entry changes
+        self.loaded = False
+        self.files: Dict[Path, Tuple[Stamp, Optional[T]]] = {}
+        self.paths: Dict[str, List[Path]] = {}
+        self.entries: Dict[str, T] = {}
+
+    def path(self, slug: str) -> Optional[Path]:
+        paths = self.paths.get(slug)
+        return paths[0] if paths else None
+
+    def duplicates(self) -> Dict[str, List[Path]]:
+        return {slug: list(paths) for slug, paths in sorted(self.paths.items()) if len(paths) > 1}
+
+    def refresh(self, path: Path, *, force: bool = False) -> bool:
+        """Reparse one file; False when its stamp is unchanged since last seen."""
+        try:
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            return self.forget(path)
+        seen = self.files.get(path)
+        if seen is not None and seen[0] == stamp and not force:
+            return False
+        self.store(path, stamp, self.loader(path))
+        return True
+
+    def store(self, path: Path, stamp: Stamp, entry: Optional[T]) -> None:
+        seen = self.files.get(path)
+        if seen is not None and seen[1] is not None:
+            self._unlink(seen[1].meta.slug, path)
+        self.files[path] = (stamp, entry)
+        if entry is not None:
+            self._link(entry.meta.slug, path)
+
+    def load(self, paths: Iterable[Path], snapshot: Dict[Path, Tuple[Stamp, Optional[T]]]) -> int:
+        """Initial load that takes entries from ``snapshot`` when the file stamp still matches.
+
+        Returns how many files had to be parsed.
+        """
+        parsed = 0
+        for path in sorted(paths):
+            cached = snapshot.get(path)
+            try:
+                stamp = _stamp(path)
+            except FileNotFoundError:
+                continue
+            if cached is not None and cached[0] == stamp:
+                self.store(path, stamp, cached[1])
+            else:
+                self.store(path, stamp, self.loader(path))
+                parsed += 1
+        self.loaded = True
+        return parsed
+
+    def forget(self, path: Path) -> bool:
+        seen = self.files.get(path)
+        if seen is None:
+            return False
+        if seen[1] is not None:
+            self._unlink(seen[1].meta.slug, path)
+        del self.files[path]
+        return True
+
+    def scan(self, paths: Iterable[Path]) -> int:
+        changed = 0
+        present = set()
+        for path in paths:
+            present.add(path)
+            try:
+                changed += self.refresh(path)
+            except (OSError, ValueError, yaml.YAMLError):
+                # Half-written or malformed file: keep serving the last good version.
+                continue
+        for path in [path for path in self.files if path not in present]:
+            changed += self.forget(path)
+        return changed
+
+    def _link(self, slug: str, path: Path) -> None:
+        paths = self.paths.setdefault(slug, [])
+        if path not in paths:
+            bisect.insort(paths, path)
+        self._promote(slug)
+
+    def _unlink(self, slug: str, path: Path) -> None:
+        paths = self.paths.get(slug)
+        if not paths or path not in paths:
+            return
+        paths.remove(path)
+        if not paths:
+            del self.paths[slug]
+            self.entries.pop(slug, None)
+            if self.on_change is not None:
+                self.on_change(slug, None)
+        else:
+            self._promote(slug)
+
+    def _promote(self, slug: str) -> None:
+        entry = self.files[self.paths[slug][0]][1]
+        if entry is not None:
+            self.entries[slug] = entry
+            if self.on_change is not None:
+                self.on_change(slug, entry)
+
+
+class QuestionGroup(NamedTuple):
+    items: Tuple[Question, ...]  # sorted by slug
+    keys: Tuple[str, ...]  # the slugs of ``items``, in the same order, for bisecting
+    slugs: FrozenSet[str]
+
+    def page(self, after: Optional[str], limit: Optional[int]) -> Tuple[Sequence[Question], Optional[str]]:
+        """Up to ``limit`` questions with slugs after ``after``, plus the cursor for the next page."""
+        start = bisect.bisect_right(self.keys, after) if after is not None else 0
+        if limit is None:
+            return self.items[start:], None
+        end = start + limit
+        next_after = self.keys[end - 1] if end < len(self.items) else None
+        return self.items[start:end], next_after
+
+
+_EMPTY_GROUP = QuestionGroup((), (), frozenset())
+
+
+def _group(questions: Iterable[Question]) -> QuestionGroup:
+    items = tuple(questions)
+    keys = tuple(q.meta.slug for q in items)
+    return QuestionGroup(items, keys, frozenset(keys))
+
+
+@dataclass(frozen=True)
+class QuestionViews:
+    """Questions pre-sorted by slug and grouped by every filter ``list_questions`` takes.
+
+    Built once per content version; a filtered query walks the smallest matching
+    group and checks membership in the others, so results come out already sorted.
+    """
+
+    version: int
+    ordered: QuestionGroup
+    by_chapter: Dict[str, QuestionGroup] = field(default_factory=dict)
+    by_difficulty: Dict[str, QuestionGroup] = field(default_factory=dict)
+    in_bank: QuestionGroup = _EMPTY_GROUP
+    in_tutorial: QuestionGroup = _EMPTY_GROUP
+    # Intersections already computed for this version, keyed by the filter values. Only
+    # chapters and difficulties that exist get here, so it stays bounded by the content.
+    _selections: Dict[Tuple[Any, ...], QuestionGroup] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(cls, version: int, questions: Iterable[Question]) -> "QuestionViews":
+        ordered = sorted(questions, key=lambda q: q.meta.slug)
+        chapters: Dict[str, List[Question]] = {}
+        difficulties: Dict[str, List[Question]] = {}
+        for question in ordered:
+            chapters.setdefault(question.meta.chapter, []).append(question)
+            difficulties.setdefault(question.meta.difficulty, []).append(question)
+        return cls(
+            version=version,
+            ordered=_group(ordered),
+            by_chapter={key: _group(items) for key, items in chapters.items()},
+            by_difficulty={key: _group(items) for key, items in difficulties.items()},
+            in_bank=_group(q for q in ordered if q.meta.show_in_bank),
+            in_tutorial=_group(q for q in ordered if q.meta.show_in_tutorial),
+        )
+
+    def select(
+        self,
+        *,
+        chapter: Optional[str],
+        difficulty: Optional[str],
+        bank_only: bool,
+        tutorial_only: bool,
+    ) -> QuestionGroup:
+        groups: List[QuestionGroup] = []
+        if chapter:
+            groups.append(self.by_chapter.get(chapter, _EMPTY_GROUP))
+        if difficulty:
+            groups.append(self.by_difficulty.get(difficulty, _EMPTY_GROUP))
+        if bank_only:
+            groups.append(self.in_bank)
+        if tutorial_only:
+            groups.append(self.in_tutorial)
+        if not groups:
+            return self.ordered
+        if len(groups) == 1:
+            return groups[0]
+        if any(not group.items for group in groups):
+            return _EMPTY_GROUP  # also keeps unknown filter values out of ``_selections``
+        key = (chapter, difficulty, bank_only, tutorial_only)
+        selected = self._selections.get(key)
+        if selected is None:
+            groups.sort(key=lambda group: len(group.items))
+            smallest, others = groups[0], groups[1:]
+            selected = _group(q for q in smallest.items if all(q.meta.slug in group.slugs for group in others))
+            self._selections[key] = selected
+        return selected
 
 
 class ContentService:
-    def __init__(self, resources_dir: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        resources_dir: Optional[Path] = None,
+        snapshot_path: Optional[Path] = None,
+        *,
+        lazy_bodies: Optional[bool] = None,
+    ) -> None:
         self._resources_dir = resources_dir or settings.resources_dir
-        self._chapters_cache: Dict[str, Chapter] = {}
-        self._questions_cache: Dict[str, Question] = {}
+        # Lazy mode keeps only question metadata resident; bodies go through a bounded LRU.
+        self._lazy = settings.content_lazy_bodies if lazy_bodies is None else lazy_bodies
+        self._body_offsets: Dict[Path, int] = {}
+        self._bodies: "OrderedDict[str, Question]" = OrderedDict()
+        self._bodies_lock = threading.Lock()
+        if snapshot_path is None and resources_dir is None:
+            snapshot_path = settings.content_snapshot_path
+        self._snapshot_path = snapshot_path
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_stale = False
+        self._question_views: Optional[QuestionViews] = None
+        self._chapters: ContentIndex[Chapter] = ContentIndex(self._load_chapter, self._chapter_changed)
+        self._questions: ContentIndex[Question] = ContentIndex(self._load_question, self._question_changed)
+        self._search: Optional[SearchIndex] = None
+        self._search_build_lock = threading.Lock()
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._version = 0
+        self._lock = threading.RLock()
+        self._watch_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def version(self) -> int:
+        """Bumped whenever stored content changes; derived caches compare against it."""
+        return self._version
+
+    def scan(self) -> int:
+        """Pick up external edits: reparse files whose mtime changed and drop deleted ones.
+
+        Only the touched files are read. Returns how many files changed.
+        """
+        with self._lock:
+            changed = 0
+            if self._chapters.loaded:
+                changed += self._chapters.scan(self._chapter_paths())
+            if self._questions.loaded:
+                changed += self._questions.scan(self._question_paths())
+            if changed:
+                self._version += 1
+            return changed
+
+    def warm(self) -> None:
+        """Load all content, from the snapshot where possible, and rewrite a stale snapshot.
+
+        The search index is built here too, except in lazy mode, where that
+        means reading every question body: it is then built on a background
+        thread so start-up does not wait for it.
+        """
+        self._ensure_chapters_loaded()
+        self._ensure_questions_loaded()
+        if self._lazy:
+            threading.Thread(target=self._search_index, name="content-search-index", daemon=True).start()
+        else:
+            self._search_index()
+        if self._snapshot_stale:
+            self.save_snapshot()
+
+    def save_snapshot(self, path: Optional[Path] = None) -> Path:
+        """Write every parsed chapter and question, with file stamps, to one pickle.
+
+        A cold start then needs a single read plus a stat per file; files whose
+        stamp no longer matches are parsed again on load.
+        """
+        target = path or self._snapshot_path
+        if target is None:
+            raise RuntimeError("未配置内容快照路径")
+        self._ensure_chapters_loaded()
+        self._ensure_questions_loaded()
+        with self._lock:
+            payload = {
+                "format": SNAPSHOT_FORMAT,
+                "schema": _schema(),
+                "resources_dir": str(self._resources_dir),
+                "lazy": self._lazy,
+                "chapters": self._snapshot_files(self._chapters),
+                "questions": self._snapshot_files(self._questions),
+                "offsets": {
+                    path.relative_to(self._resources_dir).as_posix(): offset
+                    for path, offset in self._body_offsets.items()
+                    if path in self._questions.files
+                },
+            }
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+        with tmp.open("wb") as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)  # atomic, so concurrent workers never read half a file
+        self._snapshot_stale = False
+        return target
+
+    def start_watcher(self, interval: float) -> None:
+        """Poll ``resources/`` every ``interval`` seconds and apply changes via :meth:`scan`."""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="content-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=1)
+            self._watcher = None
 
     # Public API -----------------------------------------------------------
     def list_chapters(self) -> List[Chapter]:
         self._ensure_chapters_loaded()
-        return sorted(self._chapters_cache.values(), key=lambda c: c.meta.order)
+        with self._lock:  # the watcher and admin writes mutate ``entries`` in place
+            chapters = list(self._chapters.entries.values())
+        return sorted(chapters, key=lambda c: c.meta.order)
 
     def get_chapter(self, slug: str) -> Optional[Chapter]:
         self._ensure_chapters_loaded()
-        return self._chapters_cache.get(slug)
+        with self._lock:
+            return self._chapters.entries.get(slug)
 
     def list_questions(
         self,
@@ -32,22 +415,74 @@ class ContentService:
         difficulty: Optional[str] = None,
         include_tutorial_only: bool = True,
         include_bank_only: bool = True,
-    ) -> List[Question]:
-        self._ensure_questions_loaded()
-        questions = list(self._questions_cache.values())
-        if chapter:
-            questions = [q for q in questions if q.meta.chapter == chapter]
-        if difficulty:
-            questions = [q for q in questions if q.meta.difficulty == difficulty]
-        if not include_tutorial_only:
-            questions = [q for q in questions if q.meta.show_in_bank]
-        if not include_bank_only:
-            questions = [q for q in questions if q.meta.show_in_tutorial]
-        return sorted(questions, key=lambda q: q.meta.slug)
+    ) -> Sequence[Question]:
+        """Matching questions sorted by slug, as a shared tuple that must not be modified."""
+        return self._views().select(
+            chapter=chapter,
+            difficulty=difficulty,
+            bank_only=not include_tutorial_only,
+            tutorial_only=not include_bank_only,
+        ).items
+
+    def page_questions(
+        self,
+        *,
+        chapter: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[Sequence[Question], Optional[str]]:
+        """One page of :meth:`list_questions` starting after slug ``after``.
+
+        Returns the page and the slug to pass as ``after`` next, or None on the
+        last page. Cost depends on the page size, not on the bank size.
+        """
+        group = self._views().select(chapter=chapter, difficulty=difficulty, bank_only=False, tutorial_only=False)
+        return group.page(after, limit)
 
     def get_question(self, slug: str) -> Optional[Question]:
         self._ensure_questions_loaded()
-        return self._questions_cache.get(slug)
+        with self._lock:
+            question = self._questions.entries.get(slug)
+        return self.hydrate(question) if question is not None else None
+
+    def hydrate(self, question: Question) -> Question:
+        """The full question for an entry of :meth:`list_questions`.
+
+        With ``content_lazy_bodies`` listed questions carry metadata only and
+        the sections are read from disk here, keeping at most
+        ``content_body_cache_size`` bodies in memory. Otherwise a no-op.
+        """
+        if not self._lazy:
+            return question
+        slug = question.meta.slug
+        with self._bodies_lock:
+            full = self._bodies.get(slug)
+            if full is not None:
+                self._bodies.move_to_end(slug)
+                return full
+        full = self._read_full_question(question)
+        if full is None:
+            return question
+        with self._bodies_lock:
+            self._bodies[slug] = full
+            while len(self._bodies) > settings.content_body_cache_size:
+                self._bodies.popitem(last=False)
+        return full
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Call ``listener(kind, slug)`` whenever a served chapter or question changes or goes away.
+
+        ``kind`` is ``"chapter"`` or ``"question"``. Listeners run on the writing
+        thread with the content lock held, so they should only drop derived state.
+        """
+        self._listeners.append(listener)
+
+    def search(
+        self, query: str, *, kind: Optional[str] = None, limit: int = 20, offset: int = 0
+    ) -> Tuple[int, List[SearchHit]]:
+        """Ranked full-text search over chapters and questions; returns (total, page of hits)."""
+        return self._search_index().search(query, kind=kind, limit=limit, offset=offset)
 
     def upsert_chapter(
         self,
@@ -60,7 +495,8 @@ class ContentService:
     ) -> Chapter:
         chapters_dir = self._resources_dir / settings.chapters_dirname
         chapters_dir.mkdir(parents=True, exist_ok=True)
-        path = self._find_chapter_path(slug) or chapters_dir / f"{order:02d}-{slug}.md"
+        self._ensure_chapters_loaded()
+        path = self._chapters.path(slug) or chapters_dir / f"{order:02d}-{slug}.md"
         meta: Dict[str, object] = {
             "slug": slug,
             "title": title,
@@ -69,7 +505,9 @@ class ContentService:
         if description:
             meta["description"] = description
         self._write_markdown(path, meta, body)
-        self._reset_cache()
+        with self._lock:
+            self._chapters.refresh(path, force=True)
+            self._version += 1
         chapter = self.get_chapter(slug)
         if not chapter:
             raise RuntimeError("章节保存失败")
@@ -91,10 +529,20 @@ class ContentService:
         explanation: Optional[str],
         common_mistakes: Optional[str],
         advanced_insights: Optional[str],
+        test_cases: Optional[str] = None,
     ) -> Question:
+        """Write question ``slug``; ``test_cases`` of ``None`` keeps the declared cases of an existing file."""
         questions_dir = self._resources_dir / settings.questions_dirname / chapter
         questions_dir.mkdir(parents=True, exist_ok=True)
-        path = self._find_question_path(chapter, slug) or questions_dir / f"{slug}.md"
+        self._ensure_questions_loaded()
+        existing = self._questions.path(slug)
+        # A question moved to another chapter is rewritten under that chapter's directory.
+        path = questions_dir / f"{slug}.md"
+        if existing is not None and existing.parent == questions_dir:
+            path = existing
+        if test_cases is None and existing is not None:
+            current = self.get_question(slug)
+            test_cases = current.test_cases if current else None
         meta: Dict[str, object] = {
             "slug": slug,
             "chapter": chapter,
@@ -117,39 +565,218 @@ class ContentService:
             sections.append(f"### 常见错误\n{common_mistakes.strip()}")
         if advanced_insights:
             sections.append(f"### 进阶拓展\n{advanced_insights.strip()}")
+        if test_cases:
+            sections.append(f"### 测试用例\n{test_cases.strip()}")
         body = "\n\n".join(section.strip() for section in sections if section).strip()
 
         self._write_markdown(path, meta, body)
-        self._reset_cache()
+        with self._lock:
+            if existing is not None and existing != path:
+                existing.unlink()
+                self._questions.forget(existing)
+            self._questions.refresh(path, force=True)
+            self._version += 1
         question = self.get_question(slug)
         if not question:
             raise RuntimeError("题目保存失败")
         return question
 
+    def delete_chapter(self, slug: str) -> bool:
+        """Remove every file defining chapter ``slug``; False when there is none."""
+        self._ensure_chapters_loaded()
+        return self._delete(self._chapters, slug)
+
+    def delete_question(self, slug: str) -> bool:
+        """Remove every file defining question ``slug``; False when there is none."""
+        self._ensure_questions_loaded()
+        return self._delete(self._questions, slug)
+
+    def duplicate_slugs(self) -> Dict[str, Dict[str, List[str]]]:
+        """Slugs defined by more than one file, with paths relative to ``resources/``.
+
+        The first path listed is the one being served.
+        """
+        self._ensure_chapters_loaded()
+        self._ensure_questions_loaded()
+        with self._lock:
+            return {
+                "chapters": self._relative(self._chapters.duplicates()),
+                "questions": self._relative(self._questions.duplicates()),
+            }
+
     # Internal helpers ----------------------------------------------------
     def _ensure_chapters_loaded(self) -> None:
-        if self._chapters_cache:
+        self._ensure_loaded(self._chapters, self._chapter_paths, "chapters")
+
+    def _ensure_questions_loaded(self) -> None:
+        self._ensure_loaded(self._questions, self._question_paths, "questions")
+
+    def _ensure_loaded(self, index: ContentIndex, paths: Callable[[], List[Path]], kind: str) -> None:
+        if index.loaded:
             return
-        chapters_dir = self._resources_dir / settings.chapters_dirname
-        if not chapters_dir.exists():
+        with self._lock:
+            if index.loaded:
+                return
+            if self._snapshot is None:
+                self._snapshot = self._read_snapshot()
+            cached = self._snapshot.pop(kind, {})
+            current = paths()
+            parsed = index.load(current, cached)
+            if self._snapshot_path is not None and (parsed or len(cached) != len(current)):
+                self._snapshot_stale = True
+
+    def _search_index(self) -> SearchIndex:
+        """The search index, built from the loaded content on first use and kept current after.
+
+        Built outside the content lock (lazy mode reads every body from disk) and
+        rebuilt if the content changed meanwhile; changes after it is installed
+        are applied by the change hooks.
+        """
+        if self._search is not None:
+            return self._search
+        self._ensure_chapters_loaded()
+        self._ensure_questions_loaded()
+        with self._search_build_lock:
+            while self._search is None:
+                with self._lock:
+                    version = self._version
+                    chapters = list(self._chapters.entries.values())
+                    questions = list(self._questions.entries.values())
+                index = SearchIndex()
+                for chapter in chapters:
+                    index.add(self._chapter_document(chapter))
+                for question in questions:
+                    index.add(self._question_document(question))
+                with self._lock:
+                    if self._version == version:
+                        self._search = index
+            return self._search
+
+    def _chapter_changed(self, slug: str, chapter: Optional[Chapter]) -> None:
+        for listener in self._listeners:
+            listener("chapter", slug)
+        if self._search is None:
             return
-        for path in chapters_dir.glob("*.md"):
-            chapter = self._load_chapter(path)
-            if chapter:
-                self._chapters_cache[chapter.meta.slug] = chapter
+        if chapter is None:
+            self._search.remove("chapter", slug)
+        else:
+            self._search.add(self._chapter_document(chapter))
 
-    def _ensure_questions_loaded(self) -> None:
-        if self._questions_cache:
+    def _question_changed(self, slug: str, question: Optional[Question]) -> None:
+        with self._bodies_lock:
+            self._bodies.pop(slug, None)
+        for listener in self._listeners:
+            listener("question", slug)
+        if self._search is None:
             return
+        if question is None:
+            self._search.remove("question", slug)
+        else:
+            self._search.add(self._question_document(question))
+
+    @staticmethod
+    def _chapter_document(chapter: Chapter) -> Document:
+        return Document(
+            kind="chapter",
+            slug=chapter.meta.slug,
+            title=chapter.meta.title,
+            fields=[(chapter.body, 1.0), (chapter.meta.description or "", 2.0), (chapter.meta.title, 3.0)],
+        )
+
+    def _question_document(self, question: Question) -> Document:
+        def fields(full: Question) -> List[Tuple[str, float]]:
+            return [
+                (full.prompt, 1.0),
+                (full.explanation or "", 0.6),
+                (full.common_mistakes or "", 0.6),
+                (full.meta.title or "", 3.0),
+            ]
+
+        title = question.meta.title or question.meta.slug
+        if not self._lazy:
+            return Document(kind="question", slug=question.meta.slug, title=title, fields=fields(question))
+        # Index the body once without keeping it; snippets read it again from disk.
+        full = self._read_full_question(question) or question
+        return Document(
+            kind="question",
+            slug=question.meta.slug,
+            title=title,
+            fields=fields(full),
+            reload=lambda: fields(self.hydrate(question)),
+        )
+
+    def _views(self) -> QuestionViews:
+        self._ensure_questions_loaded()
+        views = self._question_views
+        if views is not None and views.version == self._version:
+            return views
+        with self._lock:
+            views = self._question_views
+            if views is None or views.version != self._version:
+                views = QuestionViews.build(self._version, self._questions.entries.values())
+                self._question_views = views
+            return views
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        """Snapshot entries by kind, with absolute paths; empty when missing or unusable."""
+        if self._snapshot_path is None or not self._snapshot_path.exists():
+            return {}
+        try:
+            with self._snapshot_path.open("rb") as handle:
+                payload = pickle.load(handle)
+        except Exception:  # noqa: BLE001 - a corrupt or incompatible snapshot just means parsing
+            return {}
+        if (
+            not isinstance(payload, dict)
+            or payload.get("format") != SNAPSHOT_FORMAT
+            or payload.get("schema") != _schema()
+            or payload.get("resources_dir") != str(self._resources_dir)
+            or payload.get("lazy", False) != self._lazy
+        ):
+            return {}
+        for name, offset in payload.get("offsets", {}).items():
+            self._body_offsets.setdefault(self._resources_dir / name, offset)
+        return {
+            kind: {self._resources_dir / name: value for name, value in payload.get(kind, {}).items()}
+            for kind in ("chapters", "questions")
+        }
+
+    def _snapshot_files(self, index: ContentIndex) -> Dict[str, Tuple[Stamp, Any]]:
+        return {path.relative_to(self._resources_dir).as_posix(): value for path, value in index.files.items()}
+
+    def _delete(self, index: ContentIndex, slug: str) -> bool:
+        with self._lock:
+            paths = list(index.paths.get(slug, []))
+            if not paths:
+                return False
+            for path in paths:
+                if path.exists():
+                    path.unlink()
+                index.forget(path)
+            self._version += 1
+            return True
+
+    def _relative(self, duplicates: Dict[str, List[Path]]) -> Dict[str, List[str]]:
+        return {
+            slug: [path.relative_to(self._resources_dir).as_posix() for path in paths]
+            for slug, paths in duplicates.items()
+        }
+
+    def _chapter_paths(self) -> List[Path]:
+        chapters_dir = self._resources_dir / settings.chapters_dirname
+        if not chapters_dir.exists():
+            return []
+        return list(chapters_dir.glob("*.md"))
+
+    def _question_paths(self) -> List[Path]:
         questions_dir = self._resources_dir / settings.questions_dirname
         if not questions_dir.exists():
-            return
-        for path in questions_dir.glob("**/*.md"):
-            if not path.is_file():
-                continue
-            question = self._load_question(path)
-            if question:
-                self._questions_cache[question.meta.slug] = question
+            return []
+        return [path for path in questions_dir.glob("**/*.md") if path.is_file()]
+
+    def _watch(self, interval: float) -> None:
+        while not self._watch_stop.wait(interval):
+            self.scan()
 
     def _load_chapter(self, path: Path) -> Optional[Chapter]:
         content = path.read_text(encoding="utf-8")
@@ -165,12 +792,19 @@ class ContentService:
         return Chapter(meta=meta, body=front_matter.body)
 
     def _load_question(self, path: Path) -> Optional[Question]:
-        content = path.read_text(encoding="utf-8")
-        front_matter = parse(content)
-        attributes = front_matter.attributes
+        if self._lazy:
+            attributes, offset = read_front_matter(path)
+            self._body_offsets[path] = offset
+            sections = None
+        else:
+            attributes, sections = parse_sections(path.read_text(encoding="utf-8"), SECTION_HEADINGS)
         required_fields = {"slug", "chapter", "difficulty", "type"}
         if not required_fields.issubset(attributes):
             return None
+        if sections is None:
+            prompt = split_sections(read_body(path, offset, EXCERPT_BYTES), SECTION_HEADINGS)["prompt"]
+        else:
+            prompt = sections["prompt"]
         meta = QuestionMetadata(
             slug=attributes["slug"],
             chapter=attributes["chapter"],
@@ -180,8 +814,51 @@ class ContentService:
             memory_limit=self._parse_memory(attributes.get("memory_limit")),
             show_in_tutorial=bool(attributes.get("show_in_tutorial", True)),
             show_in_bank=bool(attributes.get("show_in_bank", True)),
+            excerpt=make_excerpt(prompt),
         )
-        sections = self._split_question_body(front_matter.body)
+        if sections is None:
+            return Question(meta=meta, prompt="")
+        return self._question_from(meta, sections)
+
+    def _read_full_question(self, question: Question) -> Optional[Question]:
+        """Read the sections of ``question`` from disk, reindexing its file first if it changed.
+
+        A body is only read at the offset recorded with the indexed stamp; an
+        edit the watcher has not picked up yet would otherwise be split at the
+        old front-matter length and paired with the old metadata.
+        """
+        slug = question.meta.slug
+        with self._lock:
+            path = self._questions.path(slug)
+            if path is None:
+                return None
+            indexed = self._questions.files[path][0]
+        try:
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != indexed:
+            with self._lock:
+                if self._questions.refresh(path):
+                    self._version += 1
+                question = self._questions.entries.get(slug)
+                path = self._questions.path(slug)
+            if question is None or path is None:
+                return None
+        with self._lock:
+            offset = self._body_offsets.get(path)
+        try:
+            if offset is None:
+                _, offset = read_front_matter(path)
+                with self._lock:
+                    self._body_offsets[path] = offset
+            body = read_body(path, offset)
+        except FileNotFoundError:
+            return None
+        return self._question_from(question.meta, split_sections(body, SECTION_HEADINGS))
+
+    @staticmethod
+    def _question_from(meta: QuestionMetadata, sections: Dict[str, str]) -> Question:
         return Question(
             meta=meta,
             prompt=sections.get("prompt", ""),
@@ -189,6 +866,7 @@ class ContentService:
             explanation=sections.get("explanation"),
             common_mistakes=sections.get("common_mistakes"),
             advanced_insights=sections.get("advanced_insights"),
+            test_cases=sections.get("test_cases"),
         )
 
     @staticmethod
@@ -204,57 +882,11 @@ class ContentService:
             return int(value[:-2]) * 1024
         return int(value)
 
-    @staticmethod
-    def _split_question_body(body: str) -> Dict[str, str]:
-        sections: Dict[str, str] = {"prompt": body.strip()}
-        current_key = "prompt"
-        collected_lines: List[str] = []
-        for line in body.splitlines():
-            if line.startswith("### "):
-                if collected_lines:
-                    sections[current_key] = "\n".join(collected_lines).strip()
-                heading = line[4:].strip().lower()
-                key_map = {
-                    "正确答案": "answer",
-                    "解析": "explanation",
-                    "常见错误": "common_mistakes",
-                    "进阶拓展": "advanced_insights",
-                }
-                current_key = key_map.get(heading, heading)
-                collected_lines = []
-            else:
-                collected_lines.append(line)
-        if collected_lines:
-            sections[current_key] = "\n".join(collected_lines).strip()
-        return sections
-
     def _write_markdown(self, path: Path, meta: Dict[str, object], body: str) -> None:
         meta_dump = yaml.safe_dump(meta, allow_unicode=True, sort_keys=False).strip()
         content = f"---\n{meta_dump}\n---\n\n{body.strip()}\n"
         path.write_text(content, encoding="utf-8")
 
-    def _find_chapter_path(self, slug: str) -> Optional[Path]:
-        chapters_dir = self._resources_dir / settings.chapters_dirname
-        if not chapters_dir.exists():
-            return None
-        for path in chapters_dir.glob("*.md"):
-            content = path.read_text(encoding="utf-8")
-            front_matter = parse(content)
-            if front_matter.attributes.get("slug") == slug:
-                return path
-        return None
-
-    def _find_question_path(self, chapter: str, slug: str) -> Optional[Path]:
-        questions_dir = self._resources_dir / settings.questions_dirname / chapter
-        if not questions_dir.exists():
-            return None
-        for path in questions_dir.glob("*.md"):
-            content = path.read_text(encoding="utf-8")
-            front_matter = parse(content)
-            if front_matter.attributes.get("slug") == slug:
-                return path
-        return None
-
     @staticmethod
     def _format_memory(value: int) -> str:
         if value % (1024 * 1024) == 0:
@@ -263,9 +895,5 @@ class ContentService:
             return f"{value // 1024}KB"
         return str(value)
 
-    def _reset_cache(self) -> None:
-        self._chapters_cache.clear()
-        self._questions_cache.clear()
-
 
 content_service = ContentService()
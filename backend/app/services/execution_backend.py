@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from .job_queue import DONE, FAILED, PENDING, Job, SQLiteJobQueue
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .execution_service import ExecutionService
+
+EXECUTION_QUEUE = "execution"
+
+
+def wall_timeout(spec: Dict[str, Any]) -> float:
+    """Upper bound on how long a job spec may take inside the sandbox."""
+    return (float(spec["time_limit"]) + 2) * len(spec.get("cases") or [None]) + 2
+
+
+class ExecutionBackend(ABC):
+    """Where job specs run.
+
+    A spec is a plain dict (``code``, ``stdin`` or ``cases``, ``time_limit``,
+    ``memory_limit``); the result is the runner payload that
+    ``ExecutionService`` turns into response models.
+    """
+
+    @abstractmethod
+    def run(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def run_async(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+
+class LocalBackend(ExecutionBackend):
+    """Runs specs in sandboxes on this machine."""
+
+    def __init__(self, service: "ExecutionService") -> None:
+        self._service = service
+
+    def run(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        return self._service.execute_job(spec)
+
+    async def run_async(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._service.execute_job_async(spec)
+
+
+class QueueBackend(ExecutionBackend):
+    """Enqueues specs for ``scripts/execution_worker.py`` processes and waits for the payload."""
+
+    def __init__(self, queue: SQLiteJobQueue, *, poll_interval: float, queue_timeout: float) -> None:
+        self._queue = queue
+        self._poll_interval = poll_interval
+        self._queue_timeout = queue_timeout
+
+    def run(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = self._queue.enqueue(spec)
+        job = self._queue.wait(job_id, timeout=self._timeout(spec), poll_interval=self._poll_interval)
+        return self._collect(job_id, job)
+
+    async def run_async(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        job_id = await loop.run_in_executor(None, self._queue.enqueue, spec)
+        deadline = time.monotonic() + self._timeout(spec)
+        while True:
+            job = await loop.run_in_executor(None, self._queue.get, job_id)
+            if job is None or job.status in (DONE, FAILED):
+                break
+            if time.monotonic() >= deadline:
+                job = None
+                break
+            await asyncio.sleep(self._poll_interval)
+        return await loop.run_in_executor(None, self._collect, job_id, job)
+
+    def depth(self) -> int:
+        return self._queue.count(PENDING)
+
+    def _timeout(self, spec: Dict[str, Any]) -> float:
+        return wall_timeout(spec) + self._queue_timeout
+
+    def _collect(self, job_id: str, job: Optional[Job]) -> Dict[str, Any]:
+        self._queue.delete(job_id)
+        if job is None or job.status not in (DONE, FAILED):
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="执行节点繁忙，请稍后重试")
+        if job.status == FAILED or job.result is None:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=job.error or "执行节点异常")
+        return job.result
+
+
+def run_worker(
+    queue: SQLiteJobQueue,
+    service: "ExecutionService",
+    *,
+    worker_id: str,
+    poll_interval: float,
+    lease: float,
+    stop: threading.Event,
+) -> None:
+    """Claim specs from ``queue`` and run them locally until ``stop`` is set.
+
+    ``lease`` must exceed the longest possible run; if the worker dies, the job
+    is handed to another worker once the lease expires.
+    """
+    while not stop.is_set():
+        job = queue.claim(worker_id, lease=lease)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        try:
+            result = service.execute_job(job.payload)
+        except Exception as exc:  # noqa: BLE001 - report anything back to the producer
+            queue.fail(job.id, str(exc) or exc.__class__.__name__)
+            continue
+        queue.complete(job.id, result)
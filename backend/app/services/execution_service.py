@@ -1,24 +1,164 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
 import json
+import platform
 import subprocess
 import sys
 import shutil
+import signal
 import tempfile
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException, status
 
 from ..core.config import settings
-from ..models.schemas import ExecutionResult
+from ..models.schemas import BatchExecutionResult, CaseResult, ExecutionCase, ExecutionResult, ResourceUsage
+from .execution_backend import EXECUTION_QUEUE, ExecutionBackend, LocalBackend, QueueBackend, wall_timeout
+from .job_queue import SQLiteJobQueue
+from .metrics import MEMORY_BUCKETS_KB, metrics
+from .result_cache import ExecutionResultCache
+from .sandbox_pool import SandboxPool
+from .scheduler import ANONYMOUS, FairScheduler
+from .workspace_pool import StaleDirCollector, WorkspacePool, default_workspace_root
 
 RUNNER_MODULE = Path(__file__).resolve().parents[1] / "utils" / "run_code.py"
+STREAM_READ_LIMIT = 1024 * 1024  # longest frame line accepted from the runner
+
+
+class ExecutionStream:
+    """A running ``run_code.py --stream`` process.
+
+    :meth:`frames` yields ``stdout``/``stderr`` frames as the program produces
+    them and always finishes with a single ``exit`` frame.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process, wall_limit: float) -> None:
+        self._process = process
+        self._deadline = time.monotonic() + wall_limit
+
+    async def send_stdin(self, data: str) -> None:
+        stdin = self._process.stdin
+        if stdin is None or stdin.is_closing():
+            return
+        try:
+            stdin.write(data.encode("utf-8"))
+            await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def close_stdin(self) -> None:
+        if self._process.stdin is not None and not self._process.stdin.is_closing():
+            self._process.stdin.close()
+
+    async def frames(self) -> AsyncIterator[Dict[str, Any]]:
+        assert self._process.stdout is not None
+        while True:
+            remaining = self._deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                line = await asyncio.wait_for(self._process.stdout.readline(), timeout=remaining)
+            except asyncio.TimeoutError:
+                await self.terminate()
+                yield {"type": "exit", "success": False, "error": "代码运行超时", "timeout": True}
+                return
+            if not line:
+                break
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                continue  # bytes written around sys.stdout, e.g. os.write(1, ...)
+            yield frame
+            if frame.get("type") == "exit":
+                return
+
+        returncode = await self._process.wait()
+        if returncode == -signal.SIGXCPU:  # killed by RLIMIT_CPU before it could write the exit frame
+            yield {"type": "exit", "success": False, "error": "代码运行超时", "timeout": True}
+            return
+        stderr = b""
+        if self._process.stderr is not None:
+            stderr = await self._process.stderr.read()
+        detail = stderr.decode("utf-8", errors="replace").strip() or f"执行失败（退出码 {returncode}）"
+        yield {"type": "exit", "success": False, "error": detail}
+
+    async def terminate(self) -> None:
+        if self._process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                self._process.kill()
+        await self._process.wait()
 
 
 class ExecutionService:
-    def __init__(self, python_executable: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        python_executable: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        backend: Optional[str] = None,
+    ) -> None:
         self._python = python_executable or sys.executable
+        size = settings.execution_pool_size if pool_size is None else pool_size
+        self._pool: Optional[SandboxPool] = None
+        if size > 0:
+            self._pool = SandboxPool(
+                self._python,
+                RUNNER_MODULE,
+                size=size,
+                max_jobs=settings.execution_pool_max_jobs,
+            )
+        self._runtime = f"{self._python}|{platform.python_version()}"
+        self._cache = ExecutionResultCache(
+            max_entries=settings.execution_cache_size,
+            ttl=settings.execution_cache_ttl,
+            persist_dir=settings.data_dir / "execution_cache" if settings.execution_cache_persist else None,
+        )
+        self._backend: ExecutionBackend = LocalBackend(self)
+        if (backend or settings.execution_backend) == "queue":
+            self._backend = QueueBackend(
+                SQLiteJobQueue(settings.execution_queue_path, EXECUTION_QUEUE),
+                poll_interval=settings.execution_queue_poll_interval,
+                queue_timeout=settings.execution_queue_timeout,
+            )
+        self._workspaces: Optional[WorkspacePool] = None
+        self._collector: Optional[StaleDirCollector] = None
+        self._scheduler = FairScheduler(
+            "execution",
+            max_concurrency=settings.execution_max_concurrency,
+            queue_size=settings.execution_queue_size,
+            rate_per_minute=settings.execution_rate_per_minute,
+            burst=settings.execution_rate_burst,
+            retry_after=settings.execution_retry_after,
+        )
+
+    def start(self) -> None:
+        if self._pool:
+            self._pool.start()
+        root = settings.execution_workspace_root or default_workspace_root(settings.data_dir)
+        if settings.execution_workspace_pool_size > 0 and self._workspaces is None:
+            self._workspaces = WorkspacePool(root, settings.execution_workspace_pool_size)
+        if settings.execution_gc_interval > 0 and self._collector is None:
+            self._collector = StaleDirCollector(
+                [settings.data_dir, root],
+                prefix="runner-",
+                max_age=settings.execution_gc_max_age,
+                interval=settings.execution_gc_interval,
+            )
+            self._collector.start()
+
+    def shutdown(self) -> None:
+        if self._pool:
+            self._pool.close()
+        if self._collector:
+            self._collector.stop()
+            self._collector = None
+        if self._workspaces:
+            self._workspaces.close()
+            self._workspaces = None
 
     def run(
         self,
@@ -28,60 +168,532 @@ class ExecutionService:
         time_limit: float = 30.0,
         memory_limit: Optional[int] = None,
     ) -> ExecutionResult:
+        payload, cached = self._cached(
+            self._cache_key(code, stdin_data, time_limit, memory_limit),
+            lambda: self._backend.run(self._spec(code, time_limit, memory_limit, stdin=stdin_data)),
+        )
+        result = self._from_payload(payload, memory_limit or settings.default_memory_limit)
+        result.cached = cached
+        return result
+
+    async def run_async(
+        self,
+        code: str,
+        *,
+        stdin_data: str | None = None,
+        time_limit: float = 30.0,
+        memory_limit: Optional[int] = None,
+        user: str = ANONYMOUS,
+        priority: bool = False,
+    ) -> ExecutionResult:
+        """Event-loop friendly variant of :meth:`run`.
+
+        Sandboxes are admitted through a :class:`FairScheduler`: at most
+        ``execution_max_concurrency`` run at once, each ``user`` is rate limited
+        (429) and served round-robin with other users, ``priority`` callers go
+        first, and a full queue answers 503. Cache hits and requests joining an
+        identical in-flight run skip the scheduler entirely.
+        """
+        timing: Dict[str, float] = {}
+        payload, cached = await self._cached_async(
+            self._cache_key(code, stdin_data, time_limit, memory_limit),
+            lambda: self._admit_and_execute(
+                timing, (user, priority), code, time_limit, memory_limit, stdin=stdin_data
+            ),
+        )
+        result = self._from_payload(payload, memory_limit or settings.default_memory_limit)
+        result.cached = cached
+        result.queue_wait_ms = timing.get("queue_wait_ms", 0.0)
+        return result
+
+    def run_batch(
+        self,
+        code: str,
+        cases: Sequence[ExecutionCase],
+        *,
+        time_limit: float = 30.0,
+        memory_limit: Optional[int] = None,
+    ) -> BatchExecutionResult:
+        """Run one submission against several stdin cases in a single sandbox.
+
+        The runner compiles the source once and forks a separately limited
+        child per case, so each case keeps its own time and memory budget.
+        """
+        raw_cases = self._check_cases(cases)
+        payload, cached = self._cached(
+            self._cache_key(code, json.dumps(raw_cases, ensure_ascii=False), time_limit, memory_limit),
+            lambda: self._backend.run(self._spec(code, time_limit, memory_limit, cases=raw_cases)),
+        )
+        result = self._to_batch_result(payload, cases, memory_limit or settings.default_memory_limit)
+        result.cached = cached
+        return result
+
+    async def run_batch_async(
+        self,
+        code: str,
+        cases: Sequence[ExecutionCase],
+        *,
+        time_limit: float = 30.0,
+        memory_limit: Optional[int] = None,
+        user: str = ANONYMOUS,
+        priority: bool = False,
+    ) -> BatchExecutionResult:
+        raw_cases = self._check_cases(cases)
+        timing: Dict[str, float] = {}
+        payload, cached = await self._cached_async(
+            self._cache_key(code, json.dumps(raw_cases, ensure_ascii=False), time_limit, memory_limit),
+            lambda: self._admit_and_execute(
+                timing, (user, priority), code, time_limit, memory_limit, cases=raw_cases
+            ),
+        )
+        result = self._to_batch_result(payload, cases, memory_limit or settings.default_memory_limit)
+        result.cached = cached
+        result.queue_wait_ms = timing.get("queue_wait_ms", 0.0)
+        return result
+
+    @contextlib.asynccontextmanager
+    async def open_stream(
+        self,
+        code: str,
+        *,
+        time_limit: float = 30.0,
+        memory_limit: Optional[int] = None,
+        user: str = ANONYMOUS,
+        priority: bool = False,
+    ) -> AsyncIterator[ExecutionStream]:
+        """Start an interactive run whose output is forwarded as it is printed.
+
+        The stream holds one concurrency slot for its whole lifetime. CPU time
+        is still capped by ``time_limit``; the wall clock, which includes time
+        spent waiting for the student to type, by ``execution_stream_wall_limit``.
+        """
+        async with self._scheduler.slot(user, priority=priority):
+            job = self._prepare(self._spec(code, time_limit, memory_limit))
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *self._command(job),
+                    "--stream",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    limit=STREAM_READ_LIMIT,
+                )
+                stream = ExecutionStream(process, settings.execution_stream_wall_limit)
+                try:
+                    await stream.send_stdin(self._source_header(job))
+                    yield stream
+                finally:
+                    await stream.terminate()
+            finally:
+                self._cleanup(job)
+
+    def execute_job(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a job spec in a local sandbox and return the raw runner payload.
+
+        Used by the local backend and by queue workers; failures are encoded in
+        the payload so they survive the trip back through a job queue.
+        """
+        try:
+            return self._execute(self._prepare(spec))
+        except HTTPException as exc:
+            return self._error_payload(exc)
+
+    async def execute_job_async(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self._execute_async(self._prepare(spec))
+        except HTTPException as exc:
+            return self._error_payload(exc)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    def scheduler_stats(self) -> Dict[str, Any]:
+        stats = self._scheduler.stats()
+        if isinstance(self._backend, QueueBackend):
+            stats["backend_pending"] = self._backend.depth()
+        return stats
+
+    # Internal helpers ----------------------------------------------------
+    async def _admit_and_execute(
+        self,
+        timing: Dict[str, float],
+        caller: Tuple[str, bool],
+        code: str,
+        time_limit: float,
+        memory_limit: Optional[int],
+        **job_fields: Any,
+    ) -> Dict[str, Any]:
+        user, priority = caller
+        enqueued = time.monotonic()
+        async with self._scheduler.slot(user, priority=priority):
+            timing["queue_wait_ms"] = round((time.monotonic() - enqueued) * 1000, 3)
+            return await self._backend.run_async(self._spec(code, time_limit, memory_limit, **job_fields))
+
+    def _cache_key(
+        self,
+        code: str,
+        runner_input: Optional[str],
+        time_limit: float,
+        memory_limit: Optional[int],
+    ) -> Optional[str]:
+        if not self._cache.enabled or not self._cache.cacheable(code):
+            return None
+        memory = memory_limit or settings.default_memory_limit
+        return self._cache.make_key(code, runner_input, time_limit, memory, self._runtime)
+
+    def _cached(
+        self, key: Optional[str], compute: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        if key is None:
+            return compute(), False
+        payload = self._cache.get(key)
+        if payload is not None:
+            return payload, True
+        future, leader = self._cache.claim(key)
+        if not leader:
+            return future.result(), True
+        try:
+            payload = compute()
+        except BaseException as exc:
+            self._cache.release(key)
+            future.set_exception(exc)
+            raise
+        self._store(key, payload)
+        future.set_result(payload)
+        return payload, False
+
+    async def _cached_async(
+        self, key: Optional[str], compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        if key is None:
+            return await compute(), False
+        payload = self._cache.get(key)
+        if payload is not None:
+            return payload, True
+        future, leader = self._cache.claim(key)
+        if not leader:
+            # Shielded so a disconnecting follower cannot cancel the shared run.
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+        try:
+            payload = await compute()
+        except BaseException as exc:
+            self._cache.release(key)
+            future.set_exception(exc)
+            raise
+        self._store(key, payload)
+        future.set_result(payload)
+        return payload, False
+
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        outcomes = payload.get("cases", [payload])
+        if not any(outcome.get("timeout") or "returncode" in outcome for outcome in outcomes):
+            self._cache.put(key, payload)
+        self._cache.release(key)
+
+    @staticmethod
+    def _check_cases(cases: Sequence[ExecutionCase]) -> List[Dict[str, Any]]:
+        if not cases:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="测试用例不能为空")
+        if len(cases) > settings.execution_max_batch_cases:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"测试用例数量不能超过 {settings.execution_max_batch_cases} 个",
+            )
+        return [{"stdin": case.stdin} for case in cases]
+
+    @staticmethod
+    def _spec(code: str, time_limit: float, memory_limit: Optional[int], **fields: Any) -> Dict[str, Any]:
         if not code.strip():
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="代码不能为空")
+        spec: Dict[str, Any] = {
+            "code": code,
+            "time_limit": time_limit,
+            "memory_limit": memory_limit or settings.default_memory_limit,
+        }
+        spec.update(fields)
+        return spec
 
-        tmp_dir = tempfile.mkdtemp(prefix="runner-", dir=settings.data_dir)
-        code_file = Path(tmp_dir) / "main.py"
-        code_file.write_text(code, encoding="utf-8")
+    @staticmethod
+    def _error_payload(exc: HTTPException) -> Dict[str, Any]:
+        if exc.status_code == status.HTTP_408_REQUEST_TIMEOUT:
+            return {"timeout": True}
+        return {"returncode": -1, "detail": exc.detail}
 
-        memory = memory_limit or settings.default_memory_limit
+    def _prepare(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        code = spec["code"]
+        job: Dict[str, Any] = {
+            "time_limit": spec["time_limit"],
+            "memory_limit": spec["memory_limit"],
+            "stdout_limit": settings.execution_stdout_limit,
+            "stderr_limit": settings.execution_stderr_limit,
+            "trace_memory": settings.execution_trace_memory,
+        }
+        workspace = self._workspaces.acquire() if self._workspaces else None
+        if workspace is not None:
+            # No files at all: the source travels with the job, the workspace is reused.
+            job.update(code_file="main.py", source=code, workdir=str(workspace), workspace=str(workspace))
+        else:
+            tmp_dir = tempfile.mkdtemp(prefix="runner-", dir=settings.data_dir)
+            code_file = Path(tmp_dir) / "main.py"
+            code_file.write_text(code, encoding="utf-8")
+            job.update(code_file=str(code_file), workdir=str(Path(tmp_dir) / "workspace"), tmp_dir=tmp_dir)
+        if "cases" in spec:
+            job["cases"] = spec["cases"]
+        else:
+            job["stdin"] = spec.get("stdin")
+        return job
 
-        process = subprocess.Popen(
-            [
-                self._python,
-                "-I",
-                "-B",
-                str(RUNNER_MODULE),
-                str(code_file),
-                "--time-limit",
-                str(time_limit),
-                "--memory-limit",
-                str(memory),
-                "--workdir",
-                str(Path(tmp_dir) / "workspace"),
-            ],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+    @staticmethod
+    def _wall_timeout(job: Dict[str, Any]) -> float:
+        return wall_timeout(job)
 
+    def _execute(self, job: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            stdout, stderr = process.communicate(input=stdin_data, timeout=time_limit + 2)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise HTTPException(status_code=status.HTTP_408_REQUEST_TIMEOUT, detail="代码运行超时")
+            if self._pool:
+                return self._execute_in_pool(job)
+
+            process = subprocess.Popen(
+                self._command(job),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
 
-        if process.returncode != 0:
-            detail = stderr.strip() or f"执行失败（退出码 {process.returncode}）"
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+            try:
+                stdout, stderr = process.communicate(input=self._runner_input(job), timeout=self._wall_timeout(job))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise HTTPException(status_code=status.HTTP_408_REQUEST_TIMEOUT, detail="代码运行超时")
+
+            return self._load_payload(process.returncode, stdout, stderr)
+        finally:
+            self._cleanup(job)
+
+    async def _execute_async(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            if self._pool:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, functools.partial(self._execute_in_pool, job))
+
+            process = await asyncio.create_subprocess_exec(
+                *self._command(job),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            runner_input = self._runner_input(job)
+            stdin_bytes = runner_input.encode("utf-8") if runner_input is not None else None
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(stdin_bytes), timeout=self._wall_timeout(job)
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise HTTPException(status_code=status.HTTP_408_REQUEST_TIMEOUT, detail="代码运行超时")
+
+            return self._load_payload(
+                process.returncode,
+                stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"),
+            )
+        finally:
+            self._cleanup(job)
+
+    def _execute_in_pool(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        assert self._pool is not None
+        request = {key: value for key, value in job.items() if key not in ("tmp_dir", "workspace")}
+        try:
+            payload = self._pool.run(request, timeout=self._wall_timeout(job) + 3)
+        except (OSError, EOFError, TimeoutError, ValueError) as exc:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="运行器异常") from exc
+        self._observe(payload)
+        return payload
+
+    def _cleanup(self, job: Dict[str, Any]) -> None:
+        if "workspace" in job:
+            if self._workspaces is not None:
+                self._workspaces.release(Path(job["workspace"]))
+            else:  # the pool was closed while this job ran
+                shutil.rmtree(job["workspace"], ignore_errors=True)
+        elif "tmp_dir" in job:
+            shutil.rmtree(job["tmp_dir"], ignore_errors=True)
+
+    @staticmethod
+    def _observe(payload: Dict[str, Any]) -> None:
+        for outcome in payload.get("cases", [payload]):
+            usage = outcome.get("usage")
+            if not usage:
+                continue
+            metrics.observe("execution.wall_time_ms", usage.get("wall_time_ms"))
+            if "cpu_user_ms" in usage:
+                metrics.observe("execution.cpu_time_ms", usage["cpu_user_ms"] + usage.get("cpu_sys_ms", 0.0))
+            metrics.observe("execution.max_rss_kb", usage.get("max_rss_kb"), MEMORY_BUCKETS_KB)
+            peak = usage.get("peak_traced_bytes")
+            metrics.observe("execution.peak_traced_kb", peak / 1024 if peak is not None else None, MEMORY_BUCKETS_KB)
+
+    @staticmethod
+    def _source_header(job: Dict[str, Any]) -> str:
+        if "source" not in job:
+            return ""
+        return f"{len(job['source'].encode('utf-8'))}\n{job['source']}"
+
+    @classmethod
+    def _runner_input(cls, job: Dict[str, Any]) -> Optional[str]:
+        if "cases" in job:
+            return cls._source_header(job) + json.dumps(job["cases"], ensure_ascii=False)
+        if "source" in job:
+            return cls._source_header(job) + (job.get("stdin") or "")
+        return job.get("stdin")
+
+    def _load_payload(self, returncode: Optional[int], stdout: str, stderr: str) -> Dict[str, Any]:
+        if returncode == -signal.SIGXCPU:
+            raise HTTPException(status_code=status.HTTP_408_REQUEST_TIMEOUT, detail="代码运行超时")
+        if returncode != 0:
+            detail = stderr.strip() or f"执行失败（退出码 {returncode}）"
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
 
         try:
             payload = json.loads(stdout)
         except json.JSONDecodeError as exc:  # noqa: BLE001
-            shutil.rmtree(tmp_dir, ignore_errors=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="运行器返回数据异常") from exc
 
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._observe(payload)
+        return payload
+
+    def _command(self, job: Dict[str, Any]) -> List[str]:
+        command = [
+            self._python,
+            "-I",
+            "-B",
+            str(RUNNER_MODULE),
+            job["code_file"],
+            "--time-limit",
+            str(job["time_limit"]),
+            "--memory-limit",
+            str(job["memory_limit"]),
+            "--workdir",
+            job["workdir"],
+            "--stdout-limit",
+            str(job["stdout_limit"]),
+            "--stderr-limit",
+            str(job["stderr_limit"]),
+        ]
+        if job["trace_memory"]:
+            command.append("--trace-memory")
+        if "source" in job:
+            command.append("--source-stdin")
+        if "cases" in job:
+            command.append("--batch")
+        return command
+
+    @staticmethod
+    def _usage(outcome: Dict[str, Any], memory_limit: Optional[int] = None) -> Optional[ResourceUsage]:
+        usage = outcome.get("usage")
+        if not usage:
+            return None
+        peak = usage.get("peak_traced_bytes")
+        exceeded = "MemoryError" in (outcome.get("error") or "")
+        if memory_limit and peak is not None and peak >= memory_limit:
+            exceeded = True
+        return ResourceUsage(**usage, memory_limit=memory_limit, memory_limit_exceeded=exceeded)
+
+    @staticmethod
+    def _raise_for_failure(payload: Dict[str, Any]) -> None:
+        """Turn a runner timeout or crash reported at the top level into the matching HTTP error.
+
+        A child killed by ``RLIMIT_CPU`` (``-SIGXCPU``) ran out of time, like a
+        batch case with the same exit, so it is a timeout rather than a crash.
+        """
+        if payload.get("timeout") or payload.get("returncode") == -signal.SIGXCPU:
+            raise HTTPException(status_code=status.HTTP_408_REQUEST_TIMEOUT, detail="代码运行超时")
+        if "returncode" in payload:
+            detail = payload.get("detail") or f"执行失败（退出码 {payload['returncode']}）"
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
 
+    @staticmethod
+    def _from_payload(payload: Dict[str, Any], memory_limit: Optional[int] = None) -> ExecutionResult:
+        ExecutionService._raise_for_failure(payload)
         return ExecutionResult(
             success=bool(payload.get("success")),
             stdout=str(payload.get("stdout", "")),
             stderr=str(payload.get("stderr", "")),
             error=payload.get("error"),
+            truncated=bool(payload.get("truncated")),
+            stdout_bytes=payload.get("stdout_bytes"),
+            stderr_bytes=payload.get("stderr_bytes"),
+            usage=ExecutionService._usage(payload, memory_limit),
         )
 
+    @staticmethod
+    def _to_batch_result(
+        payload: Dict[str, Any], cases: Sequence[ExecutionCase], memory_limit: Optional[int] = None
+    ) -> BatchExecutionResult:
+        ExecutionService._raise_for_failure(payload)
+        if payload.get("compile_error"):
+            return BatchExecutionResult(
+                verdict="compile_error",
+                passed=0,
+                total=len(cases),
+                compile_error=payload["compile_error"],
+                cases=[],
+            )
+
+        results: List[CaseResult] = []
+        for index, (case, raw) in enumerate(zip(cases, payload.get("cases", []))):
+            if raw.get("timeout") or raw.get("returncode") == -signal.SIGXCPU:
+                results.append(
+                    CaseResult(
+                        index=index,
+                        status="time_limit_exceeded",
+                        success=False,
+                        error="代码运行超时",
+                        usage=ExecutionService._usage(raw, memory_limit),
+                    )
+                )
+                continue
+            if "returncode" in raw:
+                results.append(
+                    CaseResult(
+                        index=index,
+                        status="runtime_error",
+                        success=False,
+                        error=raw.get("detail") or f"执行失败（退出码 {raw['returncode']}）",
+                        usage=ExecutionService._usage(raw, memory_limit),
+                    )
+                )
+                continue
+            result = CaseResult(
+                index=index,
+                status="completed",
+                success=bool(raw.get("success")),
+                stdout=str(raw.get("stdout", "")),
+                stderr=str(raw.get("stderr", "")),
+                error=raw.get("error"),
+                truncated=bool(raw.get("truncated")),
+                usage=ExecutionService._usage(raw, memory_limit),
+            )
+            if not result.success:
+                result.status = "runtime_error"
+            elif case.expected_stdout is not None:
+                matched = _normalize_output(result.stdout) == _normalize_output(case.expected_stdout)
+                result.status = "accepted" if matched and not result.truncated else "wrong_answer"
+            results.append(result)
+
+        passed = sum(1 for result in results if result.status in ("accepted", "completed"))
+        verdict = next((r.status for r in results if r.status not in ("accepted", "completed")), None)
+        if verdict is None:
+            verdict = "accepted" if any(r.status == "accepted" for r in results) else "completed"
+        return BatchExecutionResult(verdict=verdict, passed=passed, total=len(cases), cases=results)
+
+
+def _normalize_output(text: str) -> str:
+    """Ignore trailing whitespace per line and trailing blank lines."""
+    return "\n".join(line.rstrip() for line in text.strip("\n").splitlines()).rstrip()
+
 
 execution_service = ExecutionService()
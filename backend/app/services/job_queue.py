@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (queue, status, created_at);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    worker: Optional[str]
+    created_at: float
+    updated_at: float
+
+
+class SQLiteJobQueue:
+    """Durable FIFO job table shared by producers and workers through one SQLite file.
+
+    Stands in for an external broker: any process on the same host that can
+    open ``path`` can enqueue or work. The file runs in WAL mode, which needs
+    shared memory between its users, so it must not be shared across hosts
+    (NFS, SMB); workers on other machines need a real broker instead.
+    Claimed jobs carry a lease; when a worker dies its job is handed out again.
+    """
+
+    def __init__(self, path: Path, queue: str) -> None:
+        self._path = path
+        self._queue = queue
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    # Producer side ---------------------------------------------------------
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, queue, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, self._queue, PENDING, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ? AND queue = ?", (job_id, self._queue)).fetchone()
+        return self._to_job(row) if row else None
+
+    def delete(self, job_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def wait(self, job_id: str, *, timeout: float, poll_interval: float) -> Optional[Job]:
+        """Block until the job is finished; ``None`` when ``timeout`` elapses first."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.status in (DONE, FAILED):
+                return job
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def count(self, status: str) -> int:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE queue = ? AND status = ?", (self._queue, status)
+            ).fetchone()
+        return int(row[0])
+
+    def list_jobs(self, statuses: List[str]) -> List[Job]:
+        marks = ", ".join("?" for _ in statuses)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE queue = ? AND status IN ({marks}) ORDER BY created_at",
+                (self._queue, *statuses),
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    # Worker side -----------------------------------------------------------
+    def claim(self, worker: str, lease: float) -> Optional[Job]:
+        """Atomically take the oldest pending (or lease-expired) job."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    """
+                    SELECT * FROM jobs
+                    WHERE queue = ? AND (status = ? OR (status = ? AND lease_expires < ?))
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (self._queue, PENDING, RUNNING, now),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, worker, now + lease, now, row["id"]),
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        if row is None:
+            return None
+        job = self._to_job(row)
+        job.status = RUNNING
+        job.worker = worker
+        return job
+
+    def renew(self, job_id: str, worker: str, lease: float) -> bool:
+        """Extend ``worker``'s lease on a running job; False if the job is no longer its own."""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND worker = ?",
+                (now + lease, now, job_id, RUNNING, worker),
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._finish(job_id, DONE, result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, FAILED, error=error)
+
+    def purge(self, older_than: float) -> int:
+        """Drop finished jobs whose last update is older than ``older_than`` seconds."""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE queue = ? AND status IN (?, ?) AND updated_at < ?",
+                (self._queue, DONE, FAILED, time.time() - older_than),
+            )
+            return cursor.rowcount
+
+    # Internal helpers ----------------------------------------------------
+    def _finish(self, job_id: str, status: str, *, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        yield conn
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            status=row["status"],
+            payload=json.loads(row["payload"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            worker=row["worker"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
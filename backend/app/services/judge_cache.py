@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form of a submission: comments, blank lines and spacing are dropped.
+
+    Code that does not parse falls back to its lines with trailing spaces removed.
+    """
+    try:
+        return ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError):
+        return "\n".join(line.rstrip() for line in code.strip().splitlines())
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Replace the ``user_code`` field of a JSON judge prompt with its normalized form."""
+    try:
+        payload = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(payload, dict) or not isinstance(payload.get("user_code"), str):
+        return prompt
+    payload["user_code"] = normalize_code(payload["user_code"])
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+
+class JudgeCache:
+    """Model responses keyed by prompt, with an in-memory LRU over a SQLite store.
+
+    ``memory_entries`` responses stay in memory; the store keeps up to
+    ``disk_entries`` and evicts the least recently used beyond that. Entries
+    older than ``ttl`` seconds are ignored and dropped.
+    """
+
+    def __init__(self, path: Path, *, memory_entries: int, disk_entries: int, ttl: float) -> None:
+        self._path = path
+        self._memory_entries = memory_entries
+        self._disk_entries = disk_entries
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.enabled:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS judge_cache ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, used_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS judge_cache_used ON judge_cache (used_at)")
+
+    @property
+    def enabled(self) -> bool:
+        return self._memory_entries > 0 or self._disk_entries > 0
+
+    @staticmethod
+    def make_key(system_prompt: str, prompt: str, model: str, temperature: float) -> str:
+        raw = json.dumps([system_prompt, normalize_prompt(prompt), model, temperature], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self._ttl:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            entry = self._read_disk(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.disk_hits += 1
+            return entry[1]
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        entry = (time.time(), payload)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None and self._disk_entries > 0:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO judge_cache (key, stored_at, used_at, payload) VALUES (?, ?, ?, ?)",
+                    (key, entry[0], entry[0], json.dumps(payload, ensure_ascii=False)),
+                )
+                self._conn.execute(
+                    "DELETE FROM judge_cache WHERE key IN "
+                    "(SELECT key FROM judge_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self._disk_entries,),
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            disk = 0
+            if self._conn is not None:
+                disk = self._conn.execute("SELECT COUNT(*) FROM judge_cache").fetchone()[0]
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._entries),
+                "disk_entries": disk,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # Internal helpers ----------------------------------------------------
+    def _remember(self, key: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        if self._memory_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._memory_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT stored_at, payload FROM judge_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row[0] > self._ttl:
+            self._conn.execute("DELETE FROM judge_cache WHERE key = ?", (key,))
+            return None
+        self._conn.execute("UPDATE judge_cache SET used_at = ? WHERE key = ?", (now, key))
+        return float(row[0]), json.loads(row[1])
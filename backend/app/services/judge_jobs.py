@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+from .job_queue import DONE, FAILED, PENDING, RUNNING, Job, SQLiteJobQueue
+from .judge_service import LLMJudge, judge_service
+
+JUDGE_QUEUE = "judge"
+# Short lease renewed while the model call runs, so a dead process's jobs return within a minute.
+JOB_LEASE = 60.0
+LEASE_RENEW_INTERVAL = JOB_LEASE / 3
+PURGE_INTERVAL = 60.0
+
+
+class JudgeJobService:
+    """Background judge requests: submit returns at once, workers call the model.
+
+    Jobs are rows in a :class:`SQLiteJobQueue`, so pending work survives a
+    restart. A heartbeat thread renews the short lease of every job this
+    process is working on; jobs a crashed or restarted process left running are
+    claimed again once their lease lapses, while other live processes sharing
+    the queue keep the jobs they hold.
+    """
+
+    def __init__(
+        self,
+        judge: LLMJudge,
+        queue: SQLiteJobQueue,
+        *,
+        workers: int,
+        queue_size: int,
+        retention: float,
+        poll_interval: float = 0.2,
+    ) -> None:
+        self._judge = judge
+        self._queue = queue
+        self._workers = workers
+        self._queue_size = queue_size
+        self._retention = retention
+        self._poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._last_purge = 0.0
+        self._active: Dict[str, str] = {}  # job id -> worker, for lease renewal
+        self._active_lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        prefix = uuid.uuid4().hex[:8]
+        for index in range(self._workers):
+            thread = threading.Thread(
+                target=self._work, args=(f"{prefix}-{index}",), name=f"judge-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._renew_leases, name="judge-lease-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            # A worker may be inside a model call; it stays daemonic and, with the heartbeat
+            # stopped, its job is reclaimed when the lease lapses.
+            thread.join(timeout=1)
+        self._threads = []
+
+    def submit(self, system_prompt: str, prompt: str, *, user: str) -> Job:
+        if self._queue.count(PENDING) >= self._queue_size:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="判题队列已满，请稍后重试",
+                headers={"Retry-After": str(settings.judge_retry_after)},
+            )
+        job_id = self._queue.enqueue({"system_prompt": system_prompt, "prompt": prompt, "user": user})
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job:
+        job = self._queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="判题任务不存在")
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Job:
+        """Long-poll: return once the job is finished or ``timeout`` seconds pass."""
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await loop.run_in_executor(None, self.get, job_id)
+            if job.status in (DONE, FAILED) or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(self._poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self._workers if self._threads else 0,
+            "pending": self._queue.count(PENDING),
+            "running": self._queue.count(RUNNING),
+            "done": self._queue.count(DONE),
+            "failed": self._queue.count(FAILED),
+        }
+
+    # Internal helpers ----------------------------------------------------
+    def _work(self, worker: str) -> None:
+        while not self._stop.is_set():
+            self._maybe_purge()
+            job = self._queue.claim(worker, lease=JOB_LEASE)
+            if job is None:
+                self._stop.wait(self._poll_interval)
+                continue
+            with self._active_lock:
+                self._active[job.id] = worker
+            try:
+                result = self._judge.evaluate(job.payload["system_prompt"], job.payload["prompt"])
+            except HTTPException as exc:
+                self._queue.fail(job.id, str(exc.detail))
+            except Exception as exc:  # noqa: BLE001 - surface any failure to the poller
+                self._queue.fail(job.id, str(exc) or exc.__class__.__name__)
+            else:
+                self._queue.complete(job.id, result.dict(exclude={"raw_response"}))
+            finally:
+                with self._active_lock:
+                    self._active.pop(job.id, None)
+
+    def _renew_leases(self) -> None:
+        while not self._stop.wait(LEASE_RENEW_INTERVAL):
+            with self._active_lock:
+                active = list(self._active.items())
+            for job_id, worker in active:
+                self._queue.renew(job_id, worker, JOB_LEASE)
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        self._queue.purge(self._retention)
+
+
+judge_jobs = JudgeJobService(
+    judge_service,
+    SQLiteJobQueue(settings.judge_job_path, JUDGE_QUEUE),
+    workers=settings.judge_job_workers,
+    queue_size=settings.judge_job_queue_size,
+    retention=settings.judge_job_retention,
+)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+from ..models.content import Question
+from .content_service import ContentService, content_service
+
+JUDGE_SYSTEM_PROMPT = (
+    "你是一名耐心的 Python 新手导师，需要根据题目要求判断学习者提交的代码是否完全满足题意。请逐步指出：\n"
+    "1. 代码是否满足功能需求；\n2. 若不满足，请列出问题，并给出修改建议；\n3. 若满足，说明通过原因。\n"
+    "请使用中文分步说明。"
+)
+HINT_SYSTEM_PROMPT = (
+    "你是一名耐心的 Python 新手导师。学习者的代码已在测试用例上运行，结果与参考答案不一致，"
+    "`failed_case` 给出了输入、期望输出与实际输出。请用中文分步指出问题所在并给出修改提示，"
+    "不要直接给出完整代码。"
+)
+MIN_CODE_TOKENS = 200  # the submission keeps at least this much even when the question text is long
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per four other characters."""
+    wide = sum(1 for char in text if ord(char) > 0x2E80)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def trim_to_budget(text: str, budget: int, *, keep_tail: bool = False) -> str:
+    """Cut ``text`` to about ``budget`` tokens on line boundaries, marking the gap.
+
+    With ``keep_tail`` the last third of the budget goes to the end of the text,
+    which for code usually holds the output logic. A line that does not fit the
+    rest of the budget is cut by characters rather than dropped.
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    lines = text.splitlines()
+    if budget <= 0:
+        return f"…（已省略 {len(lines)} 行）…"
+    head_budget = budget * 2 // 3 if keep_tail else budget
+    head, used = _take_lines(lines, head_budget)
+    rest = lines[len(head) :]
+    cut = bool(head) and head[-1] != lines[len(head) - 1]
+    if cut:  # the tail may still show the end of the line the head was cut in
+        rest.insert(0, lines[len(head) - 1][len(head[-1]) :])
+    tail: List[str] = []
+    if keep_tail:
+        tail, _ = _take_lines(list(reversed(rest)), budget - used, from_end=True)
+        tail.reverse()
+    omitted = max(0, len(rest) - len(tail) - cut)
+    marker = f"…（已省略 {omitted} 行）…" if omitted else "…（已截断）…"
+    return "\n".join(head + [marker] + tail)
+
+
+def _take_lines(lines: List[str], budget: int, *, from_end: bool = False) -> Tuple[List[str], int]:
+    taken: List[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            piece = _cut_line(line, budget - used - 1, from_end=from_end)
+            if piece:
+                taken.append(piece)
+                used += estimate_tokens(piece) + 1
+            break
+        taken.append(line)
+        used += cost
+    return taken, used
+
+
+def _cut_line(line: str, budget: int, *, from_end: bool = False) -> str:
+    """The longest start (or end) of ``line`` that fits ``budget`` tokens."""
+    low, high = 0, len(line)
+    while low < high:
+        middle = (low + high + 1) // 2
+        piece = line[len(line) - middle :] if from_end else line[:middle]
+        if estimate_tokens(piece) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return line[len(line) - low :] if from_end else line[:low]
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A question's judge prompt with everything but the submission rendered.
+
+    ``prefix`` + JSON-escaped code + ``suffix`` is a complete JSON object, so
+    the judge cache still finds and normalizes ``user_code``.
+    """
+
+    prefix: str
+    suffix: str
+    tokens: int
+
+    def render(self, code: str, extra: Optional[Dict[str, Any]] = None) -> str:
+        body = json.dumps(code, ensure_ascii=False)[1:-1]
+        if not extra:
+            return self.prefix + body + self.suffix
+        tail = json.dumps(extra, ensure_ascii=False)[1:]
+        return self.prefix + body + self.suffix[:-1] + ", " + tail
+
+
+class PromptBuilder:
+    """Builds judge prompts from stored questions under a token budget.
+
+    Templates are compiled once per question and reused until the content
+    version changes. The question text, reference answer and common mistakes
+    share ``judge_prompt_token_budget`` minus the code allowance, in that order
+    of priority; submissions are trimmed to ``judge_code_token_budget``.
+    """
+
+    def __init__(self, content: ContentService) -> None:
+        self._content = content
+        self._templates: Dict[str, Tuple[int, PromptTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def build(
+        self, slug: str, code: str, *, system_prompt: str = JUDGE_SYSTEM_PROMPT, **extra: Any
+    ) -> Tuple[str, str]:
+        question = self._content.get_question(slug)
+        if not question:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到题目")
+        return system_prompt, self.render(question, code, **extra)
+
+    def render(self, question: Question, code: str, **extra: Any) -> str:
+        template = self.template(question)
+        budget = settings.judge_prompt_token_budget - template.tokens
+        if extra:
+            budget -= estimate_tokens(json.dumps(extra, ensure_ascii=False))
+        code_budget = min(settings.judge_code_token_budget, max(budget, MIN_CODE_TOKENS))
+        code = trim_to_budget(code, code_budget, keep_tail=True)
+        return template.render(code, extra)
+
+    def template(self, question: Question) -> PromptTemplate:
+        version = self._content.version
+        with self._lock:
+            entry = self._templates.get(question.meta.slug)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+        template = self._compile(question)
+        with self._lock:
+            self._templates[question.meta.slug] = (version, template)
+        return template
+
+    @staticmethod
+    def _compile(question: Question) -> PromptTemplate:
+        remaining = settings.judge_prompt_token_budget - settings.judge_code_token_budget
+        remaining -= estimate_tokens(JUDGE_SYSTEM_PROMPT)
+        payload: Dict[str, str] = {}
+        for key, text in (
+            ("question", question.prompt),
+            ("reference", question.answer or ""),
+            ("common_mistakes", question.common_mistakes or ""),
+        ):
+            if not text:
+                continue
+            payload[key] = trim_to_budget(text, remaining)
+            remaining -= estimate_tokens(payload[key])
+        payload["user_code"] = ""
+        rendered = json.dumps(payload, ensure_ascii=False)
+        prefix, suffix = rendered[:-2], rendered[-2:]  # split inside the empty user_code string
+        return PromptTemplate(prefix=prefix, suffix=suffix, tokens=estimate_tokens(rendered))
+
+
+prompt_builder = PromptBuilder(content_service)
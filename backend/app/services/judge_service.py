@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import List
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
 
+from ..core.config import settings
 from ..models.content import JudgeResult
+from .judge_cache import JudgeCache
+from .metrics import metrics
+from .scheduler import ANONYMOUS, FairScheduler
 
 try:
     from volcenginesdkarkruntime import Ark
@@ -15,40 +22,199 @@ except ImportError:  # pragma: no cover - optional at install time
 
 load_dotenv()
 
+_STUB_FEEDBACK = [
+    "未检测到豆包 API Key，返回本地模拟结果。",
+    "请在 `.env` 中配置 ARK_API_KEY 以启用真实判题。",
+]
+_END = object()
+
 
 class LLMJudge:
     def __init__(self) -> None:
         self._api_key = os.environ.get("ARK_API_KEY")
         self._client = None
         if Ark and self._api_key:
-            self._client = Ark(api_key=self._api_key, timeout=1800)
+            kwargs: Dict[str, Any] = {"api_key": self._api_key, "timeout": 1800}
+            # ARK_BASE_URL points the client at another endpoint, e.g. scripts/mock_llm_server.py.
+            if os.environ.get("ARK_BASE_URL"):
+                kwargs["base_url"] = os.environ["ARK_BASE_URL"]
+            self._client = Ark(**kwargs)
+        self._scheduler = FairScheduler(
+            "judge",
+            max_concurrency=settings.judge_max_concurrency,
+            queue_size=settings.judge_queue_size,
+            rate_per_minute=settings.judge_rate_per_minute,
+            burst=settings.judge_rate_burst,
+            retry_after=settings.judge_retry_after,
+        )
+        # Bounds concurrent calls to the remote API across request handlers and job workers.
+        self._inflight = threading.BoundedSemaphore(settings.judge_max_inflight)
+        self._cache = JudgeCache(
+            settings.judge_cache_path,
+            memory_entries=settings.judge_cache_size,
+            disk_entries=settings.judge_cache_disk_entries,
+            ttl=settings.judge_cache_ttl,
+        )
+
+    async def evaluate_async(
+        self, system_prompt: str, prompt: str, *, user: str = ANONYMOUS, priority: bool = False
+    ) -> JudgeResult:
+        """Run :meth:`evaluate` off the event loop behind the per-user fair scheduler.
+
+        Cached answers are returned straight away without taking a slot.
+        """
+        key = self._cache_key(system_prompt, prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        async with self._scheduler.slot(user, priority=priority):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._evaluate, key, system_prompt, prompt)
+
+    async def stream_async(
+        self, system_prompt: str, prompt: str, *, user: str = ANONYMOUS, priority: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Judge with the model's streaming mode.
+
+        Yields ``{"type": "start"}`` once admitted, ``{"type": "step", "text": ...}``
+        as soon as each feedback line is complete and finishes with
+        ``{"type": "done", "passed": ..., "cached": ...}``. Time to the first
+        step is recorded as ``judge.first_hint_ms``.
+        """
+        started = time.perf_counter()
+        key = self._cache_key(system_prompt, prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield {"type": "start"}
+            for line in cached.feedback_steps:
+                yield {"type": "step", "text": line}
+            yield {"type": "done", "passed": cached.passed, "cached": True}
+            return
+        async with self._scheduler.slot(user, priority=priority):
+            yield {"type": "start"}
+            lines: List[str] = []
+            async for line in _iterate_in_thread(lambda stop: self._stream_lines(system_prompt, prompt, stop)):
+                if not lines:
+                    metrics.observe("judge.first_hint_ms", (time.perf_counter() - started) * 1000)
+                lines.append(line)
+                yield {"type": "step", "text": line}
+        metrics.observe("judge.stream_total_ms", (time.perf_counter() - started) * 1000)
+        if key:
+            self._cache.put(key, JudgeResult(passed=False, feedback_steps=lines).dict(exclude={"cached"}))
+        yield {"type": "done", "passed": False, "cached": False}
+
+    def charge(self, user: str = ANONYMOUS, *, priority: bool = False) -> None:
+        """Apply ``user``'s judge quota to a background submission (429 when exhausted)."""
+        self._scheduler.charge(user, priority=priority)
+
+    def scheduler_stats(self) -> Dict[str, Any]:
+        return self._scheduler.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
 
     def evaluate(self, system_prompt: str, prompt: str) -> JudgeResult:
+        key = self._cache_key(system_prompt, prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._evaluate(key, system_prompt, prompt)
+
+    def _cache_key(self, system_prompt: str, prompt: str) -> Optional[str]:
+        # Stub answers are free and must not shadow real ones once a key is configured.
+        if not self._client or not self._cache.enabled:
+            return None
+        return self._cache.make_key(system_prompt, prompt, settings.judge_model, settings.judge_temperature)
+
+    def _lookup(self, key: Optional[str]) -> Optional[JudgeResult]:
+        payload = self._cache.get(key) if key else None
+        if payload is None:
+            return None
+        return JudgeResult(**payload, cached=True)
+
+    def _evaluate(self, key: Optional[str], system_prompt: str, prompt: str) -> JudgeResult:
         if not self._client:
             # Stub mode for本地开发
-            feedback = [
-                "未检测到豆包 API Key，返回本地模拟结果。",
-                "请在 `.env` 中配置 ARK_API_KEY 以启用真实判题。",
-            ]
-            return JudgeResult(passed=False, feedback_steps=feedback)
+            return JudgeResult(passed=False, feedback_steps=list(_STUB_FEEDBACK))
 
         try:
-            response = self._client.chat.completions.create(
-                model="doubao-seed-1.6-250615",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                thinking={"type": "disabled"},
-                temperature=0.6,
-            )
+            with self._inflight:
+                response = self._client.chat.completions.create(**self._request(system_prompt, prompt))
         except Exception as exc:  # pragma: no cover - network call
             raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
 
         content = response.choices[0].message.content if response.choices else ""
         feedback = content.splitlines() if content else []
         # 由调用方解析是否通过；此处简单返回原始信息
-        return JudgeResult(passed=False, feedback_steps=feedback, raw_response=response.to_dict())
+        result = JudgeResult(passed=False, feedback_steps=feedback, raw_response=response.to_dict())
+        if key:
+            self._cache.put(key, result.dict(exclude={"cached"}))
+        return result
+
+    def _stream_lines(self, system_prompt: str, prompt: str, stop: threading.Event) -> Iterator[str]:
+        if not self._client:
+            yield from _STUB_FEEDBACK
+            return
+        buffer = ""
+        try:
+            with self._inflight:
+                response = self._client.chat.completions.create(**self._request(system_prompt, prompt), stream=True)
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    buffer += delta or ""
+                    while "\n" in buffer:
+                        line, buffer = buffer.split("\n", 1)
+                        yield line.rstrip("\r")
+        except Exception as exc:  # pragma: no cover - network call
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def _request(system_prompt: str, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": settings.judge_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "thinking": {"type": "disabled"},
+            "temperature": settings.judge_temperature,
+        }
+
+
+async def _iterate_in_thread(factory: Callable[[threading.Event], Iterator[Any]]) -> AsyncIterator[Any]:
+    """Drive a blocking iterator in the default executor and yield its items on the loop."""
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    stop = threading.Event()
+
+    def pump() -> None:
+        try:
+            for item in factory(stop):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+                if stop.is_set():
+                    break
+        except BaseException as exc:  # noqa: BLE001 - re-raised on the loop
+            loop.call_soon_threadsafe(queue.put_nowait, exc)
+        else:
+            loop.call_soon_threadsafe(queue.put_nowait, _END)
+
+    worker = loop.run_in_executor(None, pump)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # The consumer may have gone away mid-stream; let the thread wind down.
+        stop.set()
+        await asyncio.shield(worker)
 
 
 judge_service = LLMJudge()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# Upper bounds shared by millisecond-valued histograms.
+LATENCY_BUCKETS_MS: Sequence[float] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Upper bounds for memory histograms, in KiB.
+MEMORY_BUCKETS_KB: Sequence[float] = (1024, 4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288)
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are estimated from bucket bounds."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._bounds: List[float] = sorted(buckets)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)  # last slot is +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self._bounds, value)] += 1
+            self._count += 1
+            self._sum += value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            return {
+                "count": total,
+                "sum": round(self._sum, 3),
+                "mean": round(self._sum / total, 3) if total else None,
+                "max": self._max,
+                "p50": self._quantile(counts, total, 0.50),
+                "p95": self._quantile(counts, total, 0.95),
+                "p99": self._quantile(counts, total, 0.99),
+                "buckets": [
+                    {"le": bound, "count": count}
+                    for bound, count in zip(list(self._bounds) + [None], counts)
+                ],
+            }
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> Optional[float]:
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self._bounds[index] if index < len(self._bounds) else self._max
+        return self._max
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(buckets)
+            return self._histograms[name]
+
+    def observe(self, name: str, value: Optional[float], buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        if value is not None:
+            self.histogram(name, buckets).observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in sorted(histograms.items())}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import re
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+from ..models.content import Question
+from ..models.schemas import BatchExecutionResult, ExecutionCase, JudgeResponse
+from .content_service import ContentService, content_service
+from .execution_service import ExecutionService, execution_service
+from .judge_prompts import HINT_SYSTEM_PROMPT, JUDGE_SYSTEM_PROMPT, PromptBuilder, prompt_builder
+from .judge_service import LLMJudge, judge_service
+from .scheduler import ANONYMOUS
+
+_CODE_BLOCK = re.compile(r"```[^\n]*\n(.*?)```", re.S)
+_CHOICE = re.compile(r"[A-Za-z]")
+_TRUE_WORDS = {"正确", "对", "是", "true", "t", "yes", "y", "√"}
+_FALSE_WORDS = {"错误", "错", "否", "false", "f", "no", "n", "×"}
+# Fallback literals for generated stdin, per conversion applied to input().
+_SEED_VALUES: Dict[str, Sequence[str]] = {
+    "int": ("0", "1", "5", "10", "100"),
+    "float": ("0", "36.6", "-40", "100"),
+    "str": ("Alice", "张三", "Python"),
+}
+
+
+class PreJudge:
+    """Decides submissions locally whenever the question allows it.
+
+    判断题/单选题 are compared with the parsed answer. 编程题 with a reference
+    solution are run against the same stdin cases as the reference (declared
+    under ``### 测试用例`` or generated from the reference code) and compared
+    output by output; the model is only asked for hints when a case fails.
+    Anything else goes to :class:`LLMJudge` unchanged.
+    """
+
+    def __init__(
+        self, content: ContentService, execution: ExecutionService, judge: LLMJudge, prompts: PromptBuilder
+    ) -> None:
+        self._content = content
+        self._prompts = prompts
+        self._execution = execution
+        self._judge = judge
+        # (slug, reference digest) -> cases with the reference output filled in.
+        self._expected: Dict[Tuple[str, str], List[ExecutionCase]] = {}
+        self._lock = threading.Lock()
+
+    async def judge(
+        self, slug: str, answer: str, *, user: str = ANONYMOUS, priority: bool = False
+    ) -> JudgeResponse:
+        question = self._content.get_question(slug)
+        if not question:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到题目")
+        if not answer.strip():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="答案不能为空")
+        if question.meta.type in ("判断题", "单选题") and question.answer:
+            return self._judge_objective(question, answer)
+        reference = extract_code(question.answer)
+        if question.meta.type == "编程题" and reference:
+            cases = await self._reference_cases(question, reference)
+            if cases:
+                return await self._judge_program(question, answer, cases, user, priority)
+        result = await self._judge.evaluate_async(
+            JUDGE_SYSTEM_PROMPT, self._prompt(question, answer), user=user, priority=priority
+        )
+        return JudgeResponse(passed=result.passed, feedback_steps=result.feedback_steps, cached=result.cached)
+
+    async def judge_stream(
+        self, slug: str, answer: str, *, user: str = ANONYMOUS, priority: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of :meth:`judge` using the frames of :meth:`LLMJudge.stream_async`.
+
+        Local verdicts arrive at once; model hints are forwarded line by line and
+        the final ``done`` frame carries the verdict and its ``source``.
+        """
+        question = self._content.get_question(slug)
+        if not question:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到题目")
+        if not answer.strip():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="答案不能为空")
+        yield {"type": "start"}
+        if question.meta.type in ("判断题", "单选题") and question.answer:
+            response = self._judge_objective(question, answer)
+            for text in response.feedback_steps:
+                yield {"type": "step", "text": text}
+            yield {"type": "done", "passed": response.passed, "cached": False, "source": "local", "verdict": None}
+            return
+        reference = extract_code(question.answer)
+        cases = await self._reference_cases(question, reference) if question.meta.type == "编程题" and reference else []
+        system_prompt, prompt = JUDGE_SYSTEM_PROMPT, self._prompt(question, answer)
+        verdict: Dict[str, Any] = {"source": "llm", "verdict": None}
+        if cases:
+            result = await self._run_submission(question, answer, cases, user, priority)
+            yield {"type": "step", "text": f"通过 {result.passed}/{result.total} 组测试。"}
+            if result.verdict == "accepted" or result.compile_error:
+                if result.compile_error:
+                    yield {"type": "step", "text": "代码无法编译："}
+                    yield {"type": "step", "text": result.compile_error}
+                passed = result.verdict == "accepted"
+                yield {"type": "done", "passed": passed, "cached": False, "source": "local", "verdict": result.verdict}
+                return
+            system_prompt = HINT_SYSTEM_PROMPT
+            prompt = self._prompt(question, answer, failed_case=self._failed_case(result, cases))
+            verdict = {"passed": False, "source": "local", "verdict": result.verdict}
+        async for frame in self._judge.stream_async(system_prompt, prompt, user=user, priority=priority):
+            if frame["type"] != "start":
+                yield dict(frame, **verdict) if frame["type"] == "done" else frame
+
+    # Internal helpers ----------------------------------------------------
+    def _judge_objective(self, question: Question, answer: str) -> JudgeResponse:
+        expected = normalize_choice(question.answer or "", question.meta.type)
+        passed = expected is not None and normalize_choice(answer, question.meta.type) == expected
+        if not passed:
+            # Neither the answer nor the explanation (which usually states it) is given away.
+            return JudgeResponse(passed=False, feedback_steps=["回答错误，请再想一想。"], source="local")
+        feedback = ["回答正确。"]
+        if question.explanation:
+            feedback.append(question.explanation)
+        return JudgeResponse(passed=passed, feedback_steps=feedback, source="local")
+
+    async def _judge_program(
+        self,
+        question: Question,
+        answer: str,
+        cases: List[ExecutionCase],
+        user: str,
+        priority: bool,
+    ) -> JudgeResponse:
+        result = await self._run_submission(question, answer, cases, user, priority)
+        summary = f"通过 {result.passed}/{result.total} 组测试。"
+        if result.verdict == "accepted":
+            return JudgeResponse(passed=True, feedback_steps=[summary], source="local", verdict=result.verdict)
+        if result.compile_error:
+            feedback = [summary, "代码无法编译：", result.compile_error]
+            return JudgeResponse(passed=False, feedback_steps=feedback, source="local", verdict=result.verdict)
+        failed = self._failed_case(result, cases)
+        try:
+            hints = await self._judge.evaluate_async(
+                HINT_SYSTEM_PROMPT, self._prompt(question, answer, failed_case=failed), user=user, priority=priority
+            )
+        except HTTPException:
+            # Throttled or failed hints must not cost the user the verdict already decided.
+            return JudgeResponse(passed=False, feedback_steps=[summary], source="local", verdict=result.verdict)
+        return JudgeResponse(
+            passed=False,
+            feedback_steps=[summary] + hints.feedback_steps,
+            cached=hints.cached,
+            source="local",
+            verdict=result.verdict,
+        )
+
+    async def _run_submission(
+        self, question: Question, answer: str, cases: List[ExecutionCase], user: str, priority: bool
+    ) -> BatchExecutionResult:
+        return await self._execution.run_batch_async(
+            answer,
+            cases,
+            time_limit=settings.prejudge_time_limit,
+            memory_limit=question.meta.memory_limit,
+            user=user,
+            priority=priority,
+        )
+
+    async def _reference_cases(self, question: Question, reference: str) -> List[ExecutionCase]:
+        key = (question.meta.slug, hashlib.sha256(reference.encode("utf-8")).hexdigest())
+        with self._lock:
+            cached = self._expected.get(key)
+        if cached is not None:
+            return cached
+        inputs = declared_inputs(question.test_cases) or generate_inputs(reference)
+        inputs = inputs[: settings.execution_max_batch_cases]
+        cases: List[ExecutionCase] = []
+        if inputs:
+            try:
+                result = await self._execution.run_batch_async(
+                    reference,
+                    [ExecutionCase(stdin=stdin) for stdin in inputs],
+                    time_limit=settings.prejudge_time_limit,
+                    memory_limit=question.meta.memory_limit,
+                    user="system:prejudge",
+                    priority=True,
+                )
+            except HTTPException:
+                return []  # throttled or failed run: fall back to the model, try again next time
+            # Inputs the reference itself cannot handle (EOF in a loop, bad literal) are dropped.
+            cases = [
+                ExecutionCase(stdin=stdin, expected_stdout=case.stdout)
+                for stdin, case in zip(inputs, result.cases)
+                if case.status == "completed" and not case.truncated
+            ]
+        if cases or not inputs:
+            # An empty result from a run that failed every case may be transient, so it is not kept.
+            with self._lock:
+                self._expected[key] = cases
+        return cases
+
+    @staticmethod
+    def _failed_case(result: BatchExecutionResult, cases: List[ExecutionCase]) -> Dict[str, object]:
+        case = next((case for case in result.cases if case.status != "accepted"), None)
+        if case is None:
+            return {"status": result.verdict}
+        return {
+            "stdin": cases[case.index].stdin,
+            "expected_stdout": cases[case.index].expected_stdout,
+            "actual_stdout": case.stdout,
+            "stderr": case.stderr,
+            "status": case.status,
+        }
+
+    def _prompt(self, question: Question, answer: str, **extra: Any) -> str:
+        return self._prompts.render(question, answer, **extra)
+
+
+def extract_code(answer: Optional[str]) -> Optional[str]:
+    if not answer:
+        return None
+    match = _CODE_BLOCK.search(answer)
+    return match.group(1) if match else None
+
+
+def declared_inputs(section: Optional[str]) -> List[str]:
+    """Each fenced block under ``### 测试用例`` is the full stdin of one case."""
+    if not section:
+        return []
+    return [block if block.endswith("\n") else block + "\n" for block in _CODE_BLOCK.findall(section)]
+
+
+def normalize_choice(value: str, qtype: str) -> Optional[str]:
+    text = value.strip().strip("。.").lower()
+    if qtype == "判断题":
+        if text in _TRUE_WORDS:
+            return "true"
+        if text in _FALSE_WORDS:
+            return "false"
+        return None
+    match = _CHOICE.search(value)
+    return match.group(0).upper() if match else None
+
+
+def generate_inputs(reference: str, count: int = 6) -> List[str]:
+    """Build stdin cases from how the reference reads its input.
+
+    Each ``input()`` call is typed by the ``int``/``float`` wrapped around it and
+    fed literals from the reference (and their neighbours) or seed values. Numeric
+    reads inside loops cycle through all candidates; text reads inside loops get a
+    run of values followed by the string literals the code compares against, which
+    usually include the sentinel that ends the loop.
+    """
+    try:
+        tree = ast.parse(reference)
+    except SyntaxError:
+        return []
+    reads: List[Tuple[str, bool]] = []
+    _collect_reads(tree, reads, in_loop=False)
+    if not reads:
+        return [""]
+    numbers: List[str] = []
+    words: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            for value in (node.value, node.value - 1, node.value + 1):
+                if str(value) not in numbers:
+                    numbers.append(str(value))
+        elif isinstance(node, ast.Compare):
+            for operand in [node.left, *node.comparators]:
+                if isinstance(operand, ast.Constant) and isinstance(operand.value, str) and operand.value not in words:
+                    words.append(operand.value)
+    pools = {
+        "int": [value for value in numbers if re.fullmatch(r"-?\d+", value)] + list(_SEED_VALUES["int"]),
+        "float": numbers + list(_SEED_VALUES["float"]),
+        "str": words + list(_SEED_VALUES["str"]),
+    }
+    cases: List[str] = []
+    for index in range(count):
+        lines: List[str] = []
+        for kind, in_loop in reads:
+            pool = pools[kind]
+            if in_loop and kind != "str":
+                # Cycle through every value so a numeric sentinel (a target number) is reached.
+                lines.extend(pool[(index + offset) % len(pool)] for offset in range(len(pool)))
+            elif in_loop:
+                values = numbers + pool
+                lines.extend(values[(index + offset) % len(values)] for offset in range(index + 1))
+                lines.extend(words)
+            else:
+                lines.append(pool[index % len(pool)])
+        case = "\n".join(lines) + "\n"
+        if case not in cases:
+            cases.append(case)
+    return cases
+
+
+def _collect_reads(node: ast.AST, reads: List[Tuple[str, bool]], *, in_loop: bool) -> None:
+    for child in ast.iter_child_nodes(node):
+        loop = in_loop or isinstance(node, (ast.For, ast.While))
+        if isinstance(child, ast.Call) and isinstance(child.func, ast.Name) and child.func.id in ("int", "float"):
+            if any(_is_input(arg) for arg in ast.walk(child)):
+                reads.append((child.func.id, loop))
+                continue
+        if _is_input(child):
+            reads.append(("str", loop))
+            continue
+        _collect_reads(child, reads, in_loop=loop)
+
+
+def _is_input(node: ast.AST) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "input"
+
+
+prejudge = PreJudge(content_service, execution_service, judge_service, prompt_builder)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from fastapi import Request, Response
+
+from ..core.config import settings
+from .content_service import content_service
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional at install time
+    brotli = None  # type: ignore
+
+CacheKey = Hashable
+
+
+@dataclass(frozen=True)
+class EncodedResponse:
+    """One resource serialized once: plain JSON bytes plus compressed variants."""
+
+    body: bytes
+    etag: str
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+
+    @classmethod
+    def encode(cls, payload: Any, *, min_compress: int) -> "EncodedResponse":
+        # Same encoding as FastAPI's JSONResponse.
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        # Derived from the bytes, so every worker process hands out the same ETag.
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        if len(body) < min_compress:
+            return cls(body=body, etag=etag)
+        return cls(
+            body=body,
+            etag=etag,
+            gzip=gzip.compress(body, compresslevel=6),
+            br=brotli.compress(body, quality=5) if brotli is not None else None,
+        )
+
+
+class ResponseCache:
+    """Pre-encoded JSON responses keyed by resource, answered with ETag/304 and gzip/brotli.
+
+    Entries are dropped through :meth:`invalidate` when the resource changes;
+    at most ``max_entries`` are kept, least recently used first out.
+    """
+
+    def __init__(self, *, max_entries: int, min_compress: int) -> None:
+        self._max_entries = max_entries
+        self._min_compress = min_compress
+        self._entries: "OrderedDict[CacheKey, EncodedResponse]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def respond(self, request: Request, key: CacheKey, build: Callable[[], Any]) -> Response:
+        """Serve ``key`` from the cache, calling ``build`` for a JSON-able payload on a miss.
+
+        ``build`` should read the resource itself: a read made before the call
+        can miss an invalidation and be cached as current. It may raise, e.g. a 404.
+        """
+        entry = self._get(key, build)
+        headers = {"ETag": entry.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        body = entry.body
+        if entry.br is not None and "br" in accepted:
+            body, headers["Content-Encoding"] = entry.br, "br"
+        elif entry.gzip is not None and "gzip" in accepted:
+            body, headers["Content-Encoding"] = entry.gzip, "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *keys: CacheKey) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "brotli": brotli is not None,
+            }
+
+    # Internal helpers ----------------------------------------------------
+    def _get(self, key: CacheKey, build: Callable[[], Any]) -> EncodedResponse:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self._generation
+        entry = EncodedResponse.encode(build(), min_compress=self._min_compress)
+        with self._lock:
+            # An invalidation while building means ``entry`` may hold the old content.
+            if generation == self._generation and self._max_entries > 0:
+                self._entries[key] = entry
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    accepted: Set[str] = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _content_changed(kind: str, slug: str) -> None:
+    if kind == "chapter":
+        content_responses.invalidate(("chapters",), ("chapter", slug))
+    else:
+        content_responses.invalidate(("question", slug))
+
+
+content_responses = ResponseCache(
+    max_entries=settings.content_response_cache_entries,
+    min_compress=settings.content_response_min_compress,
+)
+content_service.add_listener(_content_changed)
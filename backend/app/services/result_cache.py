@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Programs touching these modules may print something different on every run.
+_NONDETERMINISTIC = re.compile(r"\b(random|secrets|uuid|time|datetime|os\.urandom)\b")
+
+
+class ExecutionResultCache:
+    """Size-bounded LRU of runner payloads keyed by a hash of the job.
+
+    Entries expire after ``ttl`` seconds. When ``persist_dir`` is given every
+    entry is mirrored to ``<key>.json`` there so restarts keep a warm cache.
+    Concurrent identical jobs share one execution through :meth:`claim`.
+    """
+
+    def __init__(self, *, max_entries: int, ttl: float, persist_dir: Optional[Path] = None) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._persist_dir = persist_dir
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        if persist_dir:
+            persist_dir.mkdir(parents=True, exist_ok=True)
+            self._prune_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    @staticmethod
+    def make_key(code: str, runner_input: Optional[str], time_limit: float, memory_limit: int, runtime: str) -> str:
+        raw = json.dumps([code, runner_input, time_limit, memory_limit, runtime], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def cacheable(code: str) -> bool:
+        return not _NONDETERMINISTIC.search(code)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._read_disk(key)
+                if entry is not None:
+                    self._entries[key] = entry
+            if entry is not None and time.time() - entry[0] > self._ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        entry = (time.time(), payload)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._unlink(oldest)
+        if self._persist_dir:
+            path = self._persist_dir / f"{key}.json"
+            path.write_text(json.dumps({"stored_at": entry[0], "payload": payload}, ensure_ascii=False), encoding="utf-8")
+
+    def claim(self, key: str) -> Tuple[Future, bool]:
+        """Return the future for ``key`` and whether the caller must compute it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # Internal helpers ----------------------------------------------------
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._unlink(key)
+
+    def _unlink(self, key: str) -> None:
+        if self._persist_dir:
+            (self._persist_dir / f"{key}.json").unlink(missing_ok=True)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        if not self._persist_dir:
+            return None
+        path = self._persist_dir / f"{key}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return float(data["stored_at"]), data["payload"]
+
+    def _prune_disk(self) -> None:
+        assert self._persist_dir is not None
+        now = time.time()
+        files = []
+        for path in self._persist_dir.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > self._ttl:
+                path.unlink(missing_ok=True)
+            else:
+                files.append((mtime, path))
+        files.sort(reverse=True)
+        for _, path in files[self._max_entries :]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import queue
+import select
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+class _Worker:
+    """One warm ``run_code.py --serve`` zygote."""
+
+    def __init__(self, command: List[str]) -> None:
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.jobs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        assert self.process.stdin is not None and self.process.stdout is not None
+        self.process.stdin.write(json.dumps(job, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise TimeoutError("sandbox worker did not answer in time")
+        line = self.process.stdout.readline()
+        if not line:
+            raise EOFError("sandbox worker exited unexpectedly")
+        self.jobs += 1
+        return json.loads(line)
+
+    def close(self) -> None:
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+
+
+class SandboxPool:
+    """Keeps ``size`` pre-started runner zygotes and hands jobs to idle ones.
+
+    Each zygote forks a fresh, rlimited child per job, so isolation is the same
+    as the one-process-per-run mode; only the interpreter start-up is shared.
+    Workers are replaced after ``max_jobs`` jobs or whenever they misbehave.
+    """
+
+    def __init__(self, python_executable: str, runner: Path, *, size: int, max_jobs: int) -> None:
+        self._command = [python_executable, "-I", "-B", str(runner), "--serve"]
+        self._size = size
+        self._max_jobs = max_jobs
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._closed = False
+
+    def start(self) -> None:
+        with self._lock:
+            missing = max(self._size - self._workers, 0)
+            self._workers += missing
+        for started in range(missing):
+            try:
+                self._idle.put(self._spawn())
+            except OSError:
+                with self._lock:
+                    self._workers -= missing - started - 1  # ``_spawn`` gave back its own slot
+                raise
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.close()
+            with self._lock:
+                self._workers -= 1
+
+    def run(self, job: Dict[str, Any], *, timeout: float) -> Dict[str, Any]:
+        worker = self._acquire()
+        healthy = False
+        try:
+            response = worker.request(job, timeout=timeout)
+            healthy = True
+            return response
+        finally:
+            self._release(worker, healthy)
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            spawn = self._idle.empty() and self._workers < self._size
+            if spawn:
+                self._workers += 1
+        if spawn:
+            return self._spawn()
+        return self._idle.get()
+
+    def _spawn(self) -> _Worker:
+        """Start a worker for a slot already counted in ``_workers``; give the slot back on failure."""
+        try:
+            return _Worker(self._command)
+        except OSError:
+            with self._lock:
+                self._workers -= 1
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        if healthy and worker.alive and worker.jobs < self._max_jobs and not self._closed:
+            self._idle.put(worker)
+            return
+        worker.close()
+        if self._closed:
+            with self._lock:
+                self._workers -= 1
+            return
+        # Recycle in the background so the caller does not pay for the restart.
+        threading.Thread(target=self._replace, daemon=True).start()
+
+    def _replace(self) -> None:
+        with contextlib.suppress(OSError):
+            self._idle.put(self._spawn())
+
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+
+ANONYMOUS = "anonymous"
+# Users idle this long (and with a refilled bucket) are dropped from the per-user maps.
+IDLE_AFTER = 600.0
+SWEEP_INTERVAL = 60.0
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume a token; return 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class UserCounters:
+    submitted: int = 0
+    admitted: int = 0
+    rate_limited: int = 0
+    rejected: int = 0
+    running: int = 0
+    waiting: int = 0
+
+
+class FairScheduler:
+    """Admission control shared by all requests of one kind (runs, judge calls).
+
+    Each user has a token bucket of ``burst`` tokens refilled at
+    ``rate_per_minute``; an empty bucket means 429. At most ``max_concurrency``
+    holders run at once. Waiters are queued per user and woken round-robin
+    across users, so one user's backlog cannot starve the others. Priority
+    callers (admins) skip the bucket and wait in a lane served before all
+    users. Beyond ``queue_size`` waiters new requests get 503. Per-user state
+    of users with nothing running or waiting is forgotten once their bucket
+    would be full again, so the maps stay bounded by recent activity.
+
+    The scheduler is not thread-safe: every method, :meth:`charge` and
+    :meth:`stats` included, must be called from the event loop (``async def``
+    routes), never from a threadpool worker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int,
+        queue_size: int,
+        rate_per_minute: float,
+        burst: int,
+        retry_after: int,
+    ) -> None:
+        self.name = name
+        self._max_concurrency = max_concurrency
+        self._queue_size = queue_size
+        self._rate = rate_per_minute / 60.0
+        self._burst = max(burst, 1)
+        self._retry_after = retry_after
+        self._running = 0
+        self._waiting = 0
+        self._priority_lane: "Deque[asyncio.Future[None]]" = deque()
+        self._lanes: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._counters: Dict[str, UserCounters] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._idle_after = max(IDLE_AFTER, self._burst / self._rate if self._rate > 0 else 0.0)
+        self._last_sweep = time.monotonic()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, user: str, *, priority: bool = False) -> AsyncIterator[None]:
+        counters = self.charge(user, priority=priority)
+        if self._running < self._max_concurrency and not self._waiting:
+            self._running += 1
+        else:
+            await self._wait(user, counters, priority)
+        counters.admitted += 1
+        counters.running += 1
+        try:
+            yield
+        finally:
+            counters.running -= 1
+            self._release()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_concurrency": self._max_concurrency,
+            "queue_size": self._queue_size,
+            "rate_per_minute": round(self._rate * 60, 3),
+            "burst": self._burst,
+            "users": {user: asdict(counters) for user, counters in sorted(self._counters.items())},
+        }
+
+    def charge(self, user: str, *, priority: bool = False) -> UserCounters:
+        """Count a submission against ``user``'s quota without queueing for a slot."""
+        now = time.monotonic()
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self._evict_idle(now)
+        self._last_seen[user] = now
+        counters = self._counters.setdefault(user, UserCounters())
+        counters.submitted += 1
+        if not priority and self._rate > 0:
+            self._take_token(user, counters)
+        return counters
+
+    # Internal helpers ----------------------------------------------------
+    def _evict_idle(self, now: float) -> None:
+        self._last_sweep = now
+        cutoff = now - self._idle_after
+        for user in [user for user, seen in self._last_seen.items() if seen < cutoff]:
+            counters = self._counters.get(user)
+            if counters is not None and (counters.running or counters.waiting):
+                continue
+            del self._last_seen[user]
+            self._counters.pop(user, None)
+            self._buckets.pop(user, None)
+
+    def _take_token(self, user: str, counters: UserCounters) -> None:
+        bucket = self._buckets.get(user)
+        if bucket is None:
+            bucket = self._buckets[user] = TokenBucket(self._rate, self._burst)
+        delay = bucket.take()
+        if delay:
+            counters.rate_limited += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="提交过于频繁，请稍后再试",
+                headers={"Retry-After": str(math.ceil(delay))},
+            )
+
+    async def _wait(self, user: str, counters: UserCounters, priority: bool) -> None:
+        if self._waiting >= self._queue_size:
+            counters.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="运行队列已满，请稍后重试",
+                headers={"Retry-After": str(self._retry_after)},
+            )
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        lane = self._priority_lane if priority else self._lanes.setdefault(user, deque())
+        lane.append(future)
+        self._waiting += 1
+        counters.waiting += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation; pass it on.
+                self._release()
+            else:
+                self._discard(lane, user, future, priority)
+            raise
+        finally:
+            self._waiting -= 1
+            counters.waiting -= 1
+
+    def _release(self) -> None:
+        future = self._next_waiter()
+        if future is None:
+            self._running -= 1
+        else:
+            # Hand the slot straight to the waiter so newcomers cannot jump the queue.
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional["asyncio.Future[None]"]:
+        while self._priority_lane:
+            future = self._priority_lane.popleft()
+            if not future.done():
+                return future
+        while self._lanes:
+            user, lane = self._lanes.popitem(last=False)
+            future = None
+            while lane and future is None:
+                candidate = lane.popleft()
+                if not candidate.done():
+                    future = candidate
+            if lane:
+                self._lanes[user] = lane  # back of the rotation
+            if future is not None:
+                return future
+        return None
+
+    def _discard(
+        self, lane: "Deque[asyncio.Future[None]]", user: str, future: "asyncio.Future[None]", priority: bool
+    ) -> None:
+        with contextlib.suppress(ValueError):
+            lane.remove(future)
+        if not priority and not lane and self._lanes.get(user) is lane:
+            del self._lanes[user]
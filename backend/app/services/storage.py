@@ -20,6 +20,10 @@ class JSONStorage:
             return {}
         return json.loads(data)
 
+    def stamp(self) -> int:
+        """Modification time of the file, to notice writes made by other processes."""
+        return self._path.stat().st_mtime_ns
+
     def write(self, data: Dict[str, Any]) -> None:
         self._path.write_text(
             json.dumps(data, ensure_ascii=False, indent=2, default=self._default),
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import secrets
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 
@@ -10,9 +12,16 @@ from ..models.content import DeviceInfo, ProgressEntry, UserAccount
 from .storage import JSONStorage
 
 
+Identity = Tuple[str, bool]  # (username, is_admin)
+
+
 class UserService:
     def __init__(self) -> None:
         self._storage = JSONStorage("users.json")
+        # token_hash -> identity, rebuilt on every write so request paths never parse users.json.
+        self._sessions: Dict[str, Identity] = {}
+        self._sessions_stamp: Optional[int] = None
+        self._reload_sessions()
 
     # ------------------------------------------------------------------
     def list_users(self) -> List[UserAccount]:
@@ -30,7 +39,7 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="用户名已存在")
         account = UserAccount(username=username, password=password)
         data[username] = account.dict()
-        self._storage.write(data)
+        self._write(data)
         return account
 
     def authenticate(self, username: str, password: str) -> UserAccount:
@@ -39,6 +48,29 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
         return account
 
+    def start_session(self, username: str, device: DeviceInfo) -> Tuple[UserAccount, str]:
+        """Register ``device`` with a fresh session token; returns the account and the token.
+
+        Only the token's hash is stored, on the device entry, so removing the
+        device (or logging in again from it) revokes the token.
+        """
+        token = secrets.token_urlsafe(32)
+        device.token_hash = hash_token(token)
+        return self.register_device(username, device), token
+
+    def session_identity(self, token: str) -> Optional[Identity]:
+        """``(username, is_admin)`` of the account holding session ``token``, or ``None``.
+
+        Answered from memory; users.json is only read again when another
+        process has written it since the map was built.
+        """
+        digest = hash_token(token)
+        identity = self._sessions.get(digest)
+        if identity is None and self._sessions_stamp != self._storage.stamp():
+            self._reload_sessions()
+            identity = self._sessions.get(digest)
+        return identity
+
     def register_device(self, username: str, device: DeviceInfo) -> UserAccount:
         account = self.get_user(username)
         if not account:
@@ -75,7 +107,28 @@ class UserService:
     def _replace_account(self, account: UserAccount) -> None:
         data = self._data()
         data[account.username] = account.dict()
+        self._write(data)
+
+    def _write(self, data: Dict[str, dict]) -> None:
         self._storage.write(data)
+        self._index_sessions(data, self._storage.stamp())
+
+    def _reload_sessions(self) -> None:
+        stamp = self._storage.stamp()  # taken first, so a concurrent write is seen next time
+        self._index_sessions(self._data(), stamp)
+
+    def _index_sessions(self, data: Dict[str, dict], stamp: int) -> None:
+        sessions: Dict[str, Identity] = {}
+        for username, payload in data.items():
+            for device in payload.get("devices", []):
+                if device.get("token_hash"):
+                    sessions[device["token_hash"]] = (username, bool(payload.get("is_admin")))
+        # Swapped in whole, so lookups never see a half-built map.
+        self._sessions, self._sessions_stamp = sessions, stamp
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
 user_service = UserService()
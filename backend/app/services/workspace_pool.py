@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+WORKSPACE_PREFIX = "ws-"
+
+
+def default_workspace_root(fallback: Path) -> Path:
+    """Prefer tmpfs so workspace churn never touches the disk holding users.json."""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm / "python-101-workspaces"
+    return fallback / "workspaces"
+
+
+class WorkspacePool:
+    """Pre-created working directories that are wiped and reused between jobs.
+
+    Each pool lives in its own ``ws-<pid>-*`` directory under ``root``, so API
+    and worker processes sharing the root never wipe each other's workspaces,
+    and :class:`StaleDirCollector` can remove the directory of a process that
+    died without closing its pool.
+    """
+
+    def __init__(self, root: Path, size: int) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        self._root = Path(tempfile.mkdtemp(prefix=f"{WORKSPACE_PREFIX}{os.getpid()}-", dir=root))
+        self._idle: "queue.Queue[Path]" = queue.Queue()
+        self._closed = False
+        for index in range(size):
+            path = self._root / str(index)
+            path.mkdir()
+            self._idle.put(path)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def acquire(self) -> Optional[Path]:
+        """Return an idle workspace, or ``None`` when all are busy."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, path: Path) -> None:
+        if self._closed or path.parent != self._root:
+            shutil.rmtree(path, onerror=_force_remove)
+            if self._closed:
+                self._remove_root()
+            return
+        try:
+            self._wipe(path)
+        except OSError:
+            self._reset(path)
+        self._idle.put(path)
+
+    def close(self) -> None:
+        """Remove this pool's directory; workspaces still in use are removed on release."""
+        self._closed = True
+        while True:
+            try:
+                shutil.rmtree(self._idle.get_nowait(), onerror=_force_remove)
+            except queue.Empty:
+                break
+        self._remove_root()
+
+    def _remove_root(self) -> None:
+        try:
+            self._root.rmdir()
+        except OSError:
+            pass  # workspaces still in use
+
+    @staticmethod
+    def _wipe(path: Path) -> None:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, onerror=_force_remove)
+                else:
+                    os.unlink(entry.path)
+
+    @staticmethod
+    def _reset(path: Path) -> None:
+        if path.exists():
+            shutil.rmtree(path, onerror=_force_remove)
+        path.mkdir(parents=True)
+
+
+class StaleDirCollector(threading.Thread):
+    """Background sweeper for directories left behind by killed runs and processes.
+
+    Removes ``<prefix>*`` directories older than ``max_age`` and workspace pool
+    directories (``ws-<pid>-*``) whose owning process no longer exists.
+    """
+
+    def __init__(self, roots: Iterable[Path], *, prefix: str, max_age: float, interval: float) -> None:
+        super().__init__(name="stale-dir-collector", daemon=True)
+        self._roots = list(roots)
+        self._prefix = prefix
+        self._max_age = max_age
+        self._interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            self.collect()
+            self._stopped.wait(self._interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def collect(self) -> int:
+        removed = 0
+        cutoff = time.time() - self._max_age
+        for root in self._roots:
+            if not root.is_dir():
+                continue
+            for path in root.glob(f"{self._prefix}*"):
+                try:
+                    if not path.is_dir() or path.stat().st_mtime > cutoff:
+                        continue
+                except OSError:
+                    continue
+                shutil.rmtree(path, onerror=_force_remove)
+                removed += 1
+            for path in root.glob(f"{WORKSPACE_PREFIX}*"):
+                pid = _owner_pid(path.name)
+                if pid is None or _pid_alive(pid) or not path.is_dir():
+                    continue
+                shutil.rmtree(path, onerror=_force_remove)
+                removed += 1
+        return removed
+
+
+def _owner_pid(name: str) -> Optional[int]:
+    owner = name[len(WORKSPACE_PREFIX) :].partition("-")[0]
+    return int(owner) if owner.isdigit() else None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _force_remove(function, path, _exc_info) -> None:  # noqa: ANN001
+    # Sandboxed code may chmod its files read-only; make them writable and retry.
+    try:
+        os.chmod(os.path.dirname(path), 0o700)
+        os.chmod(path, 0o700)
+        function(path)
+    except OSError:
+        pass
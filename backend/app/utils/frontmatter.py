@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
 
 import yaml
+from yaml.resolver import Resolver
+
+_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*\Z")
+_DECIMAL = re.compile(r"[-+]?(?:0|[1-9][0-9]*)\Z")
+# Characters that make a plain YAML scalar mean something else (flow collections,
+# anchors, tags, block scalars, quoting, directives, comments).
+_INDICATORS = frozenset("[]{},#&*!|>'\"%@`")
+_BOOLEANS = {
+    value: value.lower() in ("yes", "true", "on")
+    for value in ("yes", "Yes", "YES", "no", "No", "NO", "true", "True", "TRUE",
+                  "false", "False", "FALSE", "on", "On", "ON", "off", "Off", "OFF")
+}
+_UNKNOWN = object()
 
 
 @dataclass
@@ -16,12 +31,134 @@ def parse(content: str) -> FrontMatter:
     if not content.startswith("---\n"):
         return FrontMatter(attributes={}, body=content)
 
-    parts = content.split("\n---\n", 1)
-    if len(parts) != 2:
+    end = content.find("\n---\n", 3)
+    if end == -1:
         return FrontMatter(attributes={}, body=content)
 
-    header_raw, body = parts
-    header_lines = header_raw.splitlines()[1:]  # Skip opening ---
-    header = "\n".join(header_lines)
-    attributes = yaml.safe_load(header) or {}
-    return FrontMatter(attributes=attributes, body=body.strip())
+    return FrontMatter(attributes=parse_header(content[4:end]), body=content[end + 5:].strip())
+
+
+def parse_sections(
+    content: str, headings: Mapping[str, str], default: str = "prompt"
+) -> Tuple[Dict[str, object], Dict[str, str]]:
+    """Front matter and ``###`` sections of ``content`` in one pass; see :func:`split_sections`."""
+    front_matter = parse(content)
+    return front_matter.attributes, split_sections(front_matter.body, headings, default)
+
+
+def parse_header(header: str) -> Dict[str, object]:
+    """Parse a front matter block of flat ``key: scalar`` lines.
+
+    Covers what our content uses (plain and simply quoted strings, integers,
+    booleans, nulls and comments) without going through the YAML parser. Any
+    line it is not sure about, such as lists, nested mappings, multi-line or
+    escaped strings, floats and dates, hands the whole block to ``yaml.safe_load``,
+    so the result always matches it.
+    """
+    attributes: Dict[str, object] = {}
+    for line in header.split("\n"):
+        if not line or line[0] == "#" or line.isspace():
+            continue
+        key, sep, raw = line.partition(":")
+        if not sep or not _KEY.match(key) or _scalar(key) is not key or (raw and raw[0] != " ") or "\t" in raw:
+            return _load_yaml(header)
+        value = _scalar(raw.strip())
+        if value is _UNKNOWN:
+            return _load_yaml(header)
+        attributes[key] = value
+    return attributes
+
+
+def split_sections(body: str, headings: Mapping[str, str], default: str = "prompt") -> Dict[str, str]:
+    """Split ``body`` at ``### `` headings into ``{key: text}``.
+
+    Heading text is lower-cased and mapped through ``headings``. The whole body
+    stays under ``default`` unless some text comes before the first heading.
+    """
+    sections: Dict[str, str] = {default: body.strip()}
+    current = default
+    start = 0
+    heading = 0 if body.startswith("### ") else _next_heading(body, 0)
+    while heading != -1:
+        if heading > start:
+            sections[current] = body[start:heading].strip()
+        line_end = body.find("\n", heading)
+        start = len(body) if line_end == -1 else line_end + 1
+        title = body[heading + 4:start].strip().lower()
+        current = headings.get(title, title)
+        heading = _next_heading(body, start - 1) if line_end != -1 else -1
+    if start < len(body):
+        sections[current] = body[start:].strip()
+    return sections
+
+
+def read_front_matter(path: Path) -> Tuple[Dict[str, object], int]:
+    """Read only the front matter of ``path``; returns it with the byte offset of the body.
+
+    Mirrors :func:`parse`: without a closed ``---`` block the whole file is body.
+    """
+    with path.open("rb") as handle:
+        first = handle.readline()
+        if first != b"---\n":
+            return {}, 0
+        offset = len(first)
+        lines = []
+        while True:
+            line = handle.readline()
+            if not line:
+                return {}, 0
+            offset += len(line)
+            if line.rstrip(b"\n") == b"---":
+                break
+            lines.append(line)
+    attributes = parse_header(b"".join(lines).decode("utf-8").rstrip("\n"))
+    return attributes, offset
+
+
+def read_body(path: Path, offset: int, limit: Optional[int] = None) -> str:
+    """The body of ``path`` starting at the offset found by :func:`read_front_matter`.
+
+    With ``limit`` at most that many bytes are read; a character cut in half is dropped.
+    """
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        if limit is None:
+            data = handle.read().decode("utf-8")
+        else:
+            data = handle.read(limit).decode("utf-8", errors="ignore")
+        return data.replace("\r\n", "\n").strip()
+
+
+def _next_heading(body: str, start: int) -> int:
+    index = body.find("\n### ", start)
+    return -1 if index == -1 else index + 1
+
+
+def _scalar(value: str) -> object:
+    if not value:
+        return None
+    first = value[0]
+    if first in "'\"":
+        inner = value[1:-1]
+        if len(value) < 2 or value[-1] != first or first in inner or "\\" in inner:
+            return _UNKNOWN
+        return inner
+    if first in _INDICATORS or (first in "-?:" and (len(value) == 1 or value[1] == " ")):
+        return _UNKNOWN
+    if ": " in value or " #" in value or value[-1] == ":":
+        return _UNKNOWN
+    for tag, pattern in Resolver.yaml_implicit_resolvers.get(first, ()):
+        if not pattern.match(value):
+            continue
+        if tag == "tag:yaml.org,2002:null":
+            return None
+        if tag == "tag:yaml.org,2002:bool":
+            return _BOOLEANS[value]
+        if tag == "tag:yaml.org,2002:int" and _DECIMAL.match(value):
+            return int(value)
+        return _UNKNOWN  # floats, dates, octal/hex/sexagesimal ints, merge keys
+    return value
+
+
+def _load_yaml(header: str) -> Dict[str, object]:
+    return yaml.safe_load(header) or {}
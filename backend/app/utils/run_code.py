@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import collections
 import contextlib
 import io
 import json
 import os
 import resource
+import select
 import signal
 import sys
 import tempfile
+import time
+import tracemalloc
 import traceback
-from types import MappingProxyType
+from types import CodeType, MappingProxyType
 
 
 def _disable_network() -> None:
@@ -62,25 +66,7 @@ def _apply_limit(resource_name: int, value: int) -> None:
         resource.setrlimit(resource_name, (soft, current_hard))
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Sandbox runner")
-    parser.add_argument("code_file", help="Path to user code")
-    parser.add_argument("--time-limit", type=float, default=30.0)
-    parser.add_argument("--memory-limit", type=int, default=None)
-    parser.add_argument("--workdir", type=str, default=None)
-    args = parser.parse_args()
-
-    _set_limits(args.time_limit, args.memory_limit)
-    _disable_network()
-
-    temp_dir: str | None = None
-    if args.workdir:
-        os.makedirs(args.workdir, exist_ok=True)
-        os.chdir(args.workdir)
-    else:
-        temp_dir = tempfile.mkdtemp(prefix="sandbox-")
-        os.chdir(temp_dir)
-
+def _prepare_interpreter() -> None:
     os.environ.update(
         {
             "PYTHONSAFEPATH": "1",
@@ -92,12 +78,116 @@ def main() -> None:
     # Only keep minimal search path (stdlib and script directory)
     sys.path = [sys.path[0]] + [p for p in sys.path[1:] if "site-packages" not in p]
 
-    code_path = args.code_file
-    with open(code_path, "r", encoding="utf-8") as handle:
-        source = handle.read()
 
-    stdout_buffer = io.StringIO()
-    stderr_buffer = io.StringIO()
+class _CappedBuffer(io.TextIOBase):
+    """Keeps at most ``limit`` UTF-8 bytes: the first half and the latest half.
+
+    Writes past the limit only rotate the tail ring, so a runaway ``print``
+    loop costs constant memory. ``total`` still counts every byte written.
+    """
+
+    def __init__(self, limit: int | None) -> None:
+        super().__init__()
+        self._head_limit = limit // 2 if limit else None
+        self._tail_limit = limit - limit // 2 if limit else 0
+        self._head: list[bytes] = []
+        self._head_size = 0
+        self._tail: collections.deque[bytes] = collections.deque()
+        self._tail_size = 0
+        self.total = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self._head_size + self._tail_size
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8", errors="replace")
+        self.total += len(data)
+        if self._head_limit is None:
+            self._head.append(data)
+            self._head_size += len(data)
+            return len(text)
+        room = self._head_limit - self._head_size
+        if room > 0:
+            self._head.append(data[:room])
+            self._head_size += len(data[:room])
+            data = data[room:]
+        if data:
+            self._tail.append(data)
+            self._tail_size += len(data)
+            while self._tail_size > self._tail_limit:
+                excess = self._tail_size - self._tail_limit
+                if len(self._tail[0]) <= excess:
+                    self._tail_size -= len(self._tail.popleft())
+                else:
+                    self._tail[0] = self._tail[0][excess:]
+                    self._tail_size -= excess
+        return len(text)
+
+    def getvalue(self) -> str:
+        head = b"".join(self._head).decode("utf-8", errors="ignore")
+        tail = b"".join(self._tail).decode("utf-8", errors="ignore")
+        if not self.truncated:
+            return head + tail
+        omitted = self.total - self._head_size - self._tail_size
+        return f"{head}\n...[输出过长，已省略 {omitted} 字节]...\n{tail}"
+
+
+class _FrameWriter(io.TextIOBase):
+    """Forwards every write as a ``{"type": name, "data": ...}`` JSON line.
+
+    Output beyond ``limit`` bytes is counted but no longer forwarded.
+    """
+
+    chunk_size = 8192
+
+    def __init__(self, name: str, sink, limit: int | None = None) -> None:  # noqa: ANN001
+        super().__init__()
+        self._name = name
+        self._sink = sink
+        self._limit = limit
+        self.total = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self._limit is not None and self.total > self._limit
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        size = len(text.encode("utf-8", errors="replace"))
+        if self.truncated:
+            self.total += size
+            return len(text)
+        self.total += size
+        if self.truncated:
+            text = text.encode("utf-8", errors="replace")[: size - (self.total - self._limit)].decode(
+                "utf-8", errors="ignore"
+            )
+        for start in range(0, len(text), self.chunk_size):
+            frame = {"type": self._name, "data": text[start : start + self.chunk_size]}
+            self._sink.write(json.dumps(frame, ensure_ascii=False) + "\n")
+        self._sink.flush()
+        return len(text)
+
+    def getvalue(self) -> str:
+        return ""
+
+
+def _execute(
+    source: str | CodeType,
+    code_path: str,
+    streams: tuple | None = None,
+    *,
+    stdout_limit: int | None = None,
+    stderr_limit: int | None = None,
+    trace_memory: bool = False,
+) -> dict:
+    stdout_buffer, stderr_buffer = streams or (_CappedBuffer(stdout_limit), _CappedBuffer(stderr_limit))
     result = {
         "stdout": "",
         "stderr": "",
@@ -113,8 +203,11 @@ def main() -> None:
     }
     locals_dict: dict[str, object] = {}
 
+    started = time.perf_counter()
+    if trace_memory:
+        tracemalloc.start()
     try:
-        compiled = compile(source, code_path, "exec")
+        compiled = source if isinstance(source, CodeType) else compile(source, code_path, "exec")
         with contextlib.redirect_stdout(stdout_buffer), contextlib.redirect_stderr(stderr_buffer):
             exec(compiled, globals_dict, locals_dict)
     except SystemExit as exc:
@@ -125,11 +218,284 @@ def main() -> None:
         result["success"] = False
         result["error"] = traceback.format_exc()
 
+    usage: dict = {"wall_time_ms": round((time.perf_counter() - started) * 1000, 3)}
+    if trace_memory:
+        usage["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result["usage"] = usage
     result["stdout"] = stdout_buffer.getvalue()
     result["stderr"] = stderr_buffer.getvalue()
+    result["stdout_bytes"] = stdout_buffer.total
+    result["stderr_bytes"] = stderr_buffer.total
+    result["truncated"] = stdout_buffer.truncated or stderr_buffer.truncated
+    return result
+
+
+def _run_forked(job: dict, source: str | CodeType | None = None) -> dict:
+    """Run one job in a freshly forked child that carries its own limits.
+
+    The parent (the warm zygote) never executes user code; it only waits for the
+    child's JSON result on a private pipe and kills it once the wall-clock
+    deadline passes. ``source`` may be a code object compiled by the parent;
+    otherwise the child uses ``job["source"]`` or reads ``job["code_file"]``.
+    """
+    time_limit = float(job.get("time_limit") or 30.0)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - child process
+        status = 0
+        try:
+            os.close(read_fd)
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (1, 2):
+                os.dup2(devnull, fd)
+            os.close(devnull)
+            _redirect_stdin(job.get("stdin") or "")
+            _set_limits(time_limit, job.get("memory_limit"))
+            workdir = job["workdir"]
+            os.makedirs(workdir, exist_ok=True)
+            os.chdir(workdir)
+            code_path = job["code_file"]
+            if source is None:
+                source = job.get("source")
+            if source is None:
+                with open(code_path, "r", encoding="utf-8") as handle:
+                    source = handle.read()
+            result = _execute(
+                source,
+                code_path,
+                stdout_limit=job.get("stdout_limit"),
+                stderr_limit=job.get("stderr_limit"),
+                trace_memory=bool(job.get("trace_memory")),
+            )
+            payload = json.dumps(result, ensure_ascii=False).encode("utf-8")
+            view = memoryview(payload)
+            while view:
+                written = os.write(write_fd, view)
+                view = view[written:]
+        except BaseException:  # noqa: BLE001
+            status = 1
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    chunks: list[bytes] = []
+    started = time.monotonic()
+    deadline = started + time_limit + 2
+    timed_out = False
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+
+    if timed_out:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGKILL)
+    _, wait_status, rusage = os.wait4(pid, 0)
+    usage = {"wall_time_ms": round((time.monotonic() - started) * 1000, 3), **_usage(rusage)}
+    if timed_out:
+        return {"timeout": True, "usage": usage}
+
+    returncode = _exit_code(wait_status)
+    if returncode != 0 or not chunks:
+        return {"returncode": returncode, "usage": usage}
+    result = json.loads(b"".join(chunks).decode("utf-8"))
+    # Keep the child's own wall time (user code only) and add wait4 counters.
+    result["usage"] = {**usage, **result.get("usage", {}), **_usage(rusage)}
+    return result
+
+
+def _redirect_stdin(data: str) -> None:
+    """Make ``data`` the child's fd 0 and rebuild ``sys.stdin`` on it.
 
-    sys.stdout.write(json.dumps(result, ensure_ascii=False))
-    sys.stdout.flush()
+    Programs see the same stdin as under the one-shot runner:
+    ``sys.stdin.buffer``, ``open(0)`` and ``os.read(0, ...)`` all work.
+    Runs before the limits, since ``RLIMIT_FSIZE`` would cap the write.
+    """
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("stdin")
+    else:  # pragma: no cover - non-Linux
+        fd = os.dup(tempfile.TemporaryFile().fileno())
+    payload = data.encode("utf-8")
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view) :]
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.dup2(fd, 0)
+    os.close(fd)
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)  # noqa: SIM115
+
+
+def _usage(rusage: resource.struct_rusage) -> dict:
+    return {
+        "cpu_user_ms": round(rusage.ru_utime * 1000, 3),
+        "cpu_sys_ms": round(rusage.ru_stime * 1000, 3),
+        "max_rss_kb": rusage.ru_maxrss,
+    }
+
+
+def _run_batch(job: dict) -> dict:
+    """Compile the job source once, then fork one limited child per case."""
+    code_path = job["code_file"]
+    source = job.get("source")
+    if source is None:
+        with open(code_path, "r", encoding="utf-8") as handle:
+            source = handle.read()
+    try:
+        compiled = compile(source, code_path, "exec")
+    except Exception as exc:  # noqa: BLE001 - SyntaxError, ValueError, RecursionError...
+        return {"compile_error": "".join(traceback.format_exception_only(type(exc), exc))}
+
+    results = []
+    for index, case in enumerate(job["cases"]):
+        case_job = dict(job, stdin=case.get("stdin"), workdir=os.path.join(job["workdir"], f"case-{index}"))
+        results.append(_run_forked(case_job, compiled))
+    return {"cases": results}
+
+
+def _handle_job(job: dict) -> dict:
+    if "cases" in job:
+        return _run_batch(job)
+    return _run_forked(job)
+
+
+def _read_source_from_stdin() -> str:
+    """Read the ``<byte length>\\n<source>`` header that precedes the program's stdin."""
+    stream = sys.stdin.buffer
+    size = int(stream.readline())
+    return stream.read(size).decode("utf-8")
+
+
+def _exit_code(wait_status: int) -> int:
+    if os.WIFSIGNALED(wait_status):
+        return -os.WTERMSIG(wait_status)
+    return os.WEXITSTATUS(wait_status)
+
+
+def serve() -> None:
+    """Zygote loop: read one JSON job per line, answer with one JSON line.
+
+    Interpreter start-up, imports and network blocking are paid once here;
+    every job then runs in its own forked child (see ``_run_forked``).
+    """
+    _disable_network()
+    _prepare_interpreter()
+    requests = sys.stdin
+    responses = sys.stdout
+    # Nothing below should be able to write into the protocol stream.
+    sys.stdin = io.StringIO()
+    sys.stdout = sys.stderr
+    for line in requests:
+        if not line.strip():
+            continue
+        try:
+            response = _handle_job(json.loads(line))
+        except Exception as exc:  # noqa: BLE001
+            response = {"returncode": -1, "detail": str(exc)}
+        responses.write(json.dumps(response, ensure_ascii=False) + "\n")
+        responses.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sandbox runner")
+    parser.add_argument("code_file", nargs="?", help="Path to user code (display name with --source-stdin)")
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    parser.add_argument("--memory-limit", type=int, default=None)
+    parser.add_argument("--workdir", type=str, default=None)
+    parser.add_argument("--stdout-limit", type=int, default=None, help="Bytes of stdout kept (head + tail)")
+    parser.add_argument("--stderr-limit", type=int, default=None, help="Bytes of stderr kept (head + tail)")
+    parser.add_argument("--trace-memory", action="store_true", help="Report the tracemalloc peak of the user code")
+    parser.add_argument("--serve", action="store_true", help="Run as a warm pool worker reading jobs from stdin")
+    parser.add_argument("--batch", action="store_true", help="Read a JSON list of stdin cases from stdin")
+    parser.add_argument("--stream", action="store_true", help="Emit output as JSON line frames while running")
+    parser.add_argument(
+        "--source-stdin",
+        action="store_true",
+        help="Read a '<byte length>\\n<source>' header from stdin instead of opening code_file",
+    )
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        return
+    if not args.code_file:
+        parser.error("code_file is required unless --serve is given")
+    source = _read_source_from_stdin() if args.source_stdin else None
+    if args.batch:
+        cases = json.load(sys.stdin)
+        _disable_network()
+        _prepare_interpreter()
+        job = {
+            "code_file": args.code_file,
+            "source": source,
+            "cases": cases,
+            "time_limit": args.time_limit,
+            "memory_limit": args.memory_limit,
+            "workdir": args.workdir or tempfile.mkdtemp(prefix="sandbox-"),
+            "stdout_limit": args.stdout_limit,
+            "stderr_limit": args.stderr_limit,
+            "trace_memory": args.trace_memory,
+        }
+        sys.stdout.write(json.dumps(_run_batch(job), ensure_ascii=False))
+        sys.stdout.flush()
+        return
+
+    _set_limits(args.time_limit, args.memory_limit)
+    _disable_network()
+
+    temp_dir: str | None = None
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        os.chdir(args.workdir)
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="sandbox-")
+        os.chdir(temp_dir)
+
+    _prepare_interpreter()
+
+    code_path = args.code_file
+    if source is None:
+        with open(code_path, "r", encoding="utf-8") as handle:
+            source = handle.read()
+
+    if args.stream:
+        sink = sys.stdout
+        writers = (_FrameWriter("stdout", sink, args.stdout_limit), _FrameWriter("stderr", sink, args.stderr_limit))
+        result = _execute(source, code_path, writers, trace_memory=args.trace_memory)
+        result["usage"].update(_usage(resource.getrusage(resource.RUSAGE_SELF)))
+        frame = {
+            "type": "exit",
+            "success": result["success"],
+            "error": result["error"],
+            "truncated": result["truncated"],
+            "stdout_bytes": result["stdout_bytes"],
+            "stderr_bytes": result["stderr_bytes"],
+            "usage": result["usage"],
+        }
+        sink.write(json.dumps(frame, ensure_ascii=False) + "\n")
+        sink.flush()
+    else:
+        result = _execute(
+            source,
+            code_path,
+            stdout_limit=args.stdout_limit,
+            stderr_limit=args.stderr_limit,
+            trace_memory=args.trace_memory,
+        )
+        result["usage"].update(_usage(resource.getrusage(resource.RUSAGE_SELF)))
+        sys.stdout.write(json.dumps(result, ensure_ascii=False))
+        sys.stdout.flush()
 
     if temp_dir:
         try:
@@ -0,0 +1,211 @@
+"""Front-matter parsing benchmark: the one-pass parser against the YAML path it replaced.
+
+Writes a synthetic question bank, checks that both parsers agree on every file,
+then times each over the whole corpus (best of ``--repeat`` rounds)::
+
+    python scripts/bench_frontmatter.py --files 10000 --repeat 5
+
+A small share of the files (``--exotic``) carry front matter the fast path
+hands to YAML (lists, escaped strings, dates), so the fallback is measured too.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.content_service import SECTION_HEADINGS  # noqa: E402
+from app.utils.frontmatter import parse_sections  # noqa: E402
+
+Parsed = Tuple[Dict[str, object], Dict[str, str]]
+
+DIFFICULTIES = ["基础", "进阶", "挑战"]
+TYPES = ["编程题", "单选题", "判断题"]
+CHAPTERS = ["basics", "loops", "functions", "strings", "collections"]
+EXOTIC_LINES = [
+    "tags: [loops, input]",
+    'title: "带\\"引号\\"的标题"',
+    "updated: 2024-05-01",
+    "weight: 1.5",
+    "aliases:\n  - old-slug\n  - older-slug",
+]
+
+
+def legacy_parse(content: str) -> Parsed:
+    """The parser as it was: split, re-join, ``yaml.safe_load``, then split the body again."""
+    if not content.startswith("---\n"):
+        return {}, legacy_split(content)
+    parts = content.split("\n---\n", 1)
+    if len(parts) != 2:
+        return {}, legacy_split(content)
+    header_raw, body = parts
+    header = "\n".join(header_raw.splitlines()[1:])
+    attributes = yaml.safe_load(header) or {}
+    return attributes, legacy_split(body.strip())
+
+
+def legacy_split(body: str) -> Dict[str, str]:
+    sections: Dict[str, str] = {"prompt": body.strip()}
+    current_key = "prompt"
+    collected_lines: List[str] = []
+    for line in body.splitlines():
+        if line.startswith("### "):
+            if collected_lines:
+                sections[current_key] = "\n".join(collected_lines).strip()
+            heading = line[4:].strip().lower()
+            key_map = {
+                "正确答案": "answer",
+                "解析": "explanation",
+                "常见错误": "common_mistakes",
+                "进阶拓展": "advanced_insights",
+                "测试用例": "test_cases",
+            }
+            current_key = key_map.get(heading, heading)
+            collected_lines = []
+        else:
+            collected_lines.append(line)
+    if collected_lines:
+        sections[current_key] = "\n".join(collected_lines).strip()
+    return sections
+
+
+def fast_parse(content: str) -> Parsed:
+    return parse_sections(content, SECTION_HEADINGS)
+
+
+def make_document(index: int, rng: random.Random, exotic: bool) -> str:
+    slug = f"q{index:05d}-bench"
+    header = [
+        f"title: 基准题 {index}",
+        f"slug: {slug}",
+        f"chapter: {rng.choice(CHAPTERS)}",
+        f"difficulty: {rng.choice(DIFFICULTIES)}",
+        f"type: {rng.choice(TYPES)}",
+        f"memory_limit: {rng.choice([8, 16, 64])}MB",
+        f"show_in_tutorial: {rng.choice(['true', 'false'])}",
+        "show_in_bank: true",
+    ]
+    if rng.random() < 0.3:
+        header.append(f"order: {rng.randint(0, 99)}")
+    if rng.random() < 0.3:
+        header.append(f"description: '第 {index} 题的说明'")
+    if exotic:
+        header.append(rng.choice(EXOTIC_LINES))
+    paragraphs = [f"第 {index} 题第 {n} 段：读取输入并输出 `result`。" * 3 for n in range(rng.randint(1, 4))]
+    prompt = "\n\n".join(paragraphs)
+    body = [
+        "## 题目正文",
+        prompt,
+        "### 正确答案",
+        "```python\nvalue = int(input())\nprint(value * 2)\n```",
+        "### 解析",
+        "先把输入转换为整数，再输出两倍的结果。" * rng.randint(1, 6),
+        "### 常见错误",
+        "- 忘记转换类型\n- 输出格式不对",
+    ]
+    if rng.random() < 0.5:
+        body += ["### 测试用例", "\n".join(f"输入: {n}\n输出: {n * 2}" for n in range(rng.randint(1, 5)))]
+    return "---\n" + "\n".join(header) + "\n---\n\n" + "\n\n".join(body) + "\n"
+
+
+def make_corpus(directory: Path, count: int, exotic: float, seed: int) -> List[Path]:
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = directory / f"q{index:05d}.md"
+        path.write_text(make_document(index, rng, rng.random() < exotic), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def time_parser(parser: Callable[[str], Parsed], paths: List[Path], repeat: int) -> Dict[str, float]:
+    texts = [path.read_text(encoding="utf-8") for path in paths]
+    parse_only = read_and_parse = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            parser(text)
+        parse_only = min(parse_only, time.perf_counter() - started)
+        started = time.perf_counter()
+        for path in paths:
+            parser(path.read_text(encoding="utf-8"))
+        read_and_parse = min(read_and_parse, time.perf_counter() - started)
+    return {
+        "parse_s": round(parse_only, 4),
+        "parse_us_per_file": round(parse_only / len(paths) * 1e6, 1),
+        "read_parse_s": round(read_and_parse, 4),
+    }
+
+
+def check(paths: List[Path]) -> List[str]:
+    """Files on which the two parsers disagree."""
+    return [
+        path.name
+        for path in paths
+        if fast_parse(path.read_text(encoding="utf-8")) != legacy_parse(path.read_text(encoding="utf-8"))
+    ]
+
+
+def run(args: argparse.Namespace, directory: Path) -> Dict[str, Any]:
+    paths = make_corpus(directory, args.files, args.exotic, args.seed)
+    mismatches = check(paths)
+    legacy = time_parser(legacy_parse, paths, args.repeat)
+    fast = time_parser(fast_parse, paths, args.repeat)
+    return {
+        "files": len(paths),
+        "corpus_mb": round(sum(path.stat().st_size for path in paths) / 1e6, 2),
+        "mismatches": mismatches[:20],
+        "legacy": legacy,
+        "fast": fast,
+        "speedup": round(legacy["parse_s"] / fast["parse_s"], 2) if fast["parse_s"] else 0.0,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"corpus        {report['files']} files, {report['corpus_mb']} MB")
+    for name in ("legacy", "fast"):
+        result = report[name]
+        print(
+            f"{name:<13} parse {result['parse_s']} s ({result['parse_us_per_file']} us/file)"
+            f"  read+parse {result['read_parse_s']} s"
+        )
+    print(f"speedup       {report['speedup']}x")
+    if report["mismatches"]:
+        print(f"MISMATCHES    {', '.join(report['mismatches'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000, help="number of synthetic question files")
+    parser.add_argument("--repeat", type=int, default=3, help="timed rounds per parser; the best one counts")
+    parser.add_argument("--exotic", type=float, default=0.02, help="share of files that need the YAML fallback")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", type=Path, help="write the corpus here and keep it (default: a temp dir)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.dir:
+        report = run(args, args.dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="frontmatter-bench-") as tmp:
+            report = run(args, Path(tmp))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    if report["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
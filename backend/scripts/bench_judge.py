@@ -0,0 +1,249 @@
+"""Judge latency/throughput benchmark: drives /judge/evaluate at a fixed concurrency.
+
+Against a running API (rate limits and the judge cache of that server apply)::
+
+    python scripts/bench_judge.py --url http://127.0.0.1:8000 --concurrency 16 --requests 400
+
+Self-contained, with the mock model and the API started in this process, per-user
+rate limits off and the response cache disabled::
+
+    python scripts/bench_judge.py --in-process --concurrency 32 --duration 30 \\
+        --mock-latency lognormal --mock-latency-ms 1200 --mock-error-rate 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.mock_llm_server import add_arguments, options_from, serve  # noqa: E402
+
+SAMPLE_CODE = 'name = input()\nprint(f"Hello, {name}!")\n'
+SAMPLE_PROMPT = {"question": "读取一个名字并输出问候语。", "user_code": SAMPLE_CODE}
+
+
+@dataclass
+class Sample:
+    status: int  # HTTP status, 0 for connection errors and timeouts
+    latency: float  # seconds until the response (or stream) completed
+    first_byte: float  # seconds until the first body byte
+    cached: bool = False
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def build_body(args: argparse.Namespace) -> Dict[str, Any]:
+    code = SAMPLE_CODE
+    if args.unique:
+        # A distinct literal changes the AST, so the normalized cache key differs too.
+        code += f'_nonce = "{uuid.uuid4().hex}"\n'
+    if args.slug:
+        return {"question_slug": args.slug, "code": code}
+    prompt = dict(SAMPLE_PROMPT, user_code=code)
+    return {
+        "system_prompt": "请判断代码是否满足题意。",
+        "prompt": json.dumps(prompt, ensure_ascii=False),
+    }
+
+
+def send(args: argparse.Namespace) -> Sample:
+    path = "/judge/stream" if args.stream else "/judge/evaluate"
+    data = json.dumps(build_body(args), ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+    request = urllib.request.Request(args.url.rstrip("/") + path, data=data, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=args.timeout) as response:
+            first = response.read(1)
+            first_byte = time.perf_counter() - started
+            body = first + response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        exc.read()
+        elapsed = time.perf_counter() - started
+        return Sample(exc.code, elapsed, elapsed)
+    except (urllib.error.URLError, OSError):
+        elapsed = time.perf_counter() - started
+        return Sample(0, elapsed, elapsed)
+    latency = time.perf_counter() - started
+    if args.stream:
+        # A failure after the stream opened arrives as an error frame with status 200.
+        if b"event: error" in body:
+            return Sample(502, latency, first_byte)
+        return Sample(status, latency, first_byte)
+    try:
+        cached = bool(json.loads(body).get("cached"))
+    except ValueError:
+        cached = False
+    return Sample(status, latency, first_byte, cached)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    issued = 0
+
+    def next_slot() -> bool:
+        nonlocal issued
+        with lock:
+            if deadline is not None:
+                return time.monotonic() < deadline
+            if issued >= args.requests:
+                return False
+            issued += 1
+            return True
+
+    def worker() -> None:
+        while next_slot():
+            sample = send(args)
+            with lock:
+                samples.append(sample)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed, args)
+
+
+def summarize(samples: List[Sample], elapsed: float, args: argparse.Namespace) -> Dict[str, Any]:
+    ok = [sample for sample in samples if sample.status == 200]
+    statuses = Counter(sample.status for sample in samples)
+    latencies = [sample.latency * 1000 for sample in ok]
+    report: Dict[str, Any] = {
+        "endpoint": "/judge/stream" if args.stream else "/judge/evaluate",
+        "concurrency": args.concurrency,
+        "requests": len(samples),
+        "succeeded": len(ok),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "cached": sum(1 for sample in ok if sample.cached),
+        "latency_ms": _distribution(latencies),
+    }
+    if args.stream:
+        report["first_byte_ms"] = _distribution([sample.first_byte * 1000 for sample in ok])
+    return report
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(max(values), 1) if values else 0.0,
+        "mean": round(sum(values) / len(values), 1) if values else 0.0,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"endpoint      {report['endpoint']}  (concurrency {report['concurrency']})")
+    print(f"requests      {report['requests']}  ok {report['succeeded']}  cached {report['cached']}")
+    print(f"elapsed       {report['elapsed_s']} s  throughput {report['throughput_rps']} req/s")
+    print(f"errors        {report['error_rate']:.2%}  by status {report['statuses']}")
+    for key in ("latency_ms", "first_byte_ms"):
+        if key in report:
+            dist = report[key]
+            print(
+                f"{key:<13} p50 {dist['p50']}  p95 {dist['p95']}  p99 {dist['p99']}"
+                f"  max {dist['max']}  mean {dist['mean']}"
+            )
+
+
+def start_in_process(args: argparse.Namespace) -> None:
+    """Start the mock model and the API on free local ports and point ``--url`` at it."""
+    mock_port = _free_port()
+    serve("127.0.0.1", mock_port, options_from(args, "mock-"))
+    os.environ["ARK_BASE_URL"] = f"http://127.0.0.1:{mock_port}/api/v3"
+    os.environ.setdefault("ARK_API_KEY", "mock")
+
+    import uvicorn
+
+    from app.core.config import settings
+    from app.dependencies import get_judge_service
+    from app.main import app
+    from app.services.judge_service import Ark, LLMJudge
+
+    if Ark is None:
+        print("warning: volcengine-python-sdk[ark] is not installed, the judge answers with its stub", file=sys.stderr)
+    # Services are built at import time, so the judge is rebuilt after the overrides.
+    settings.judge_rate_per_minute = 0
+    settings.judge_queue_size = max(settings.judge_queue_size, args.concurrency)
+    if args.judge_concurrency:
+        settings.judge_max_concurrency = args.judge_concurrency
+        settings.judge_max_inflight = args.judge_concurrency
+    if not args.cache:
+        settings.judge_cache_size = 0
+        settings.judge_cache_disk_entries = 0
+    judge = LLMJudge()
+    app.dependency_overrides[get_judge_service] = lambda: judge
+
+    api_port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=api_port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-api", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    args.url = f"http://127.0.0.1:{api_port}"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests kept open at once")
+    parser.add_argument("--requests", type=int, default=200, help="total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=0.0, help="run for this many seconds instead")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request client timeout in seconds")
+    parser.add_argument("--stream", action="store_true", help="use /judge/stream and report time to first byte")
+    parser.add_argument("--slug", help="judge against a stored question instead of a raw prompt")
+    parser.add_argument("--token", help="session token from /auth/login to judge as (admins skip the rate limit)")
+    parser.add_argument("--unique", action="store_true", help="vary each submission so the judge cache misses")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--in-process", action="store_true", help="start the mock model and the API here")
+    parser.add_argument("--cache", action="store_true", help="keep the judge cache on with --in-process")
+    parser.add_argument("--judge-concurrency", type=int, default=0, help="judge slots with --in-process")
+    add_arguments(parser, "mock-")
+    args = parser.parse_args()
+
+    if args.in_process:
+        start_in_process(args)
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Parse all chapters and questions and write the content snapshot.
+
+Run as part of a deploy so the first request of every worker skips parsing::
+
+    python scripts/build_content_snapshot.py
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.services.content_service import ContentService  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=Path, default=settings.resources_dir)
+    parser.add_argument("--output", type=Path, default=settings.content_snapshot_path)
+    args = parser.parse_args()
+    if args.output is None:
+        parser.error("content_snapshot_path is disabled; pass --output")
+
+    started = time.perf_counter()
+    # No snapshot to read from: every file is parsed fresh.
+    service = ContentService(args.resources.resolve(), snapshot_path=None)
+    chapters = len(service.list_chapters())
+    questions = len(service.list_questions())
+    target = service.save_snapshot(args.output)
+    elapsed = time.perf_counter() - started
+    print(f"{chapters} chapters, {questions} questions -> {target} ({target.stat().st_size} bytes, {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
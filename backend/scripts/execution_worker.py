@@ -0,0 +1,66 @@
+"""Execution worker: claims jobs from the shared queue and runs them in local sandboxes.
+
+Start one or more of these on the API host (the SQLite queue cannot be shared
+across machines) and set ``execution_backend = "queue"`` on the API servers::
+
+    python scripts/execution_worker.py --threads 4
+"""
+from __future__ import annotations
+
+import argparse
+import signal
+import socket
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.services.execution_backend import EXECUTION_QUEUE, run_worker  # noqa: E402
+from app.services.execution_service import ExecutionService  # noqa: E402
+from app.services.job_queue import SQLiteJobQueue  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=2, help="jobs run at once by this worker")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{threading.get_native_id()}")
+    args = parser.parse_args()
+
+    queue = SQLiteJobQueue(settings.execution_queue_path, EXECUTION_QUEUE)
+    service = ExecutionService(backend="local")
+    service.start()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            kwargs={
+                "queue": queue,
+                "service": service,
+                "worker_id": f"{args.worker_id}/{index}",
+                "poll_interval": settings.execution_queue_poll_interval,
+                "lease": settings.execution_queue_lease,
+                "stop": stop,
+            },
+            name=f"execution-worker-{index}",
+        )
+        for index in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"execution worker {args.worker_id}: {args.threads} thread(s) on {settings.execution_queue_path}")
+    try:
+        while not stop.is_set():
+            stop.wait(1)
+    finally:
+        for thread in threads:
+            thread.join()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Offline stand-in for the Ark chat completions API.
+
+Serves ``POST /api/v3/chat/completions`` (and ``/chat/completions``) in the
+OpenAI-compatible shape the Ark SDK expects, including ``stream: true``. Point
+the backend at it with ``ARK_BASE_URL=http://127.0.0.1:8900/api/v3`` and any
+non-empty ``ARK_API_KEY``::
+
+    python scripts/mock_llm_server.py --latency lognormal --latency-ms 1500 --error-rate 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+PATHS = ("/api/v3/chat/completions", "/chat/completions")
+
+
+class MockOptions:
+    def __init__(
+        self,
+        *,
+        latency: str = "fixed",
+        latency_ms: float = 800.0,
+        jitter_ms: float = 200.0,
+        chunk_delay_ms: float = 40.0,
+        lines: int = 4,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 60.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.chunk_delay_ms = chunk_delay_ms
+        self.lines = lines
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> float:
+        """Seconds until the first token, drawn from the configured distribution."""
+        with self._lock:
+            mean, jitter = self.latency_ms, self.jitter_ms
+            if self.latency == "uniform":
+                value = self._random.uniform(mean - jitter, mean + jitter)
+            elif self.latency == "normal":
+                value = self._random.gauss(mean, jitter)
+            elif self.latency == "lognormal":
+                # Median ``mean``; ``jitter`` widens the right tail like real model latency.
+                value = mean * self._random.lognormvariate(0, jitter / mean if mean else 0)
+            else:
+                value = mean
+        return max(value, 0.0) / 1000
+
+    def roll(self) -> str:
+        """Pick the outcome of one request: ok, error, rate_limited or hang."""
+        with self._lock:
+            value = self._random.random()
+        for outcome, rate in (("error", self.error_rate), ("rate_limited", self.rate_limit_rate), ("hang", self.hang_rate)):
+            if value < rate:
+                return outcome
+            value -= rate
+        return "ok"
+
+
+def feedback_lines(messages: List[Dict[str, Any]], count: int) -> List[str]:
+    digest = hashlib.sha256(json.dumps(messages, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return [f"{index + 1}. 模拟反馈 {digest[index * 6:index * 6 + 6]}" for index in range(count)]
+
+
+def make_handler(options: MockOptions) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server API
+            if self.path.rstrip("/") not in PATHS:
+                self._json(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._json(400, {"error": {"message": "invalid json"}})
+                return
+            outcome = options.roll()
+            if outcome == "hang":
+                time.sleep(options.hang_seconds)
+            time.sleep(options.draw())
+            if outcome == "error":
+                self._json(500, {"error": {"code": "InternalServiceError", "message": "injected failure"}})
+                return
+            if outcome == "rate_limited":
+                self._json(429, {"error": {"code": "RateLimitExceeded", "message": "injected rate limit"}})
+                return
+            model = body.get("model", "mock")
+            lines = feedback_lines(body.get("messages", []), options.lines)
+            if body.get("stream"):
+                self._stream(model, lines)
+            else:
+                self._json(200, _completion(model, "\n".join(lines)))
+
+        def _stream(self, model: str, lines: List[str]) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            try:
+                for index, line in enumerate(lines):
+                    if index:
+                        time.sleep(options.chunk_delay_ms / 1000)
+                    text = line + ("\n" if index < len(lines) - 1 else "")
+                    self._event(_chunk(completion_id, model, {"content": text}, None))
+                self._event(_chunk(completion_id, model, {}, "stop"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            self.close_connection = True
+
+        def _event(self, payload: Dict[str, Any]) -> None:
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def _json(self, code: int, payload: Dict[str, Any]) -> None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server API
+            pass
+
+    return Handler
+
+
+def _completion(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(content), "total_tokens": len(content)},
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str]) -> Dict[str, Any]:
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def serve(host: str, port: int, options: MockOptions) -> ThreadingHTTPServer:
+    """Start the mock in a daemon thread and return the server (``.shutdown()`` to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    parser.add_argument(f"--{prefix}latency", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed")
+    parser.add_argument(f"--{prefix}latency-ms", type=float, default=800.0, help="mean (median for lognormal)")
+    parser.add_argument(f"--{prefix}jitter-ms", type=float, default=200.0, help="spread of the distribution")
+    parser.add_argument(f"--{prefix}chunk-delay-ms", type=float, default=40.0, help="gap between streamed lines")
+    parser.add_argument(f"--{prefix}lines", type=int, default=4, help="feedback lines per answer")
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0, help="share of requests answered 500")
+    parser.add_argument(f"--{prefix}rate-limit-rate", type=float, default=0.0, help="share answered 429")
+    parser.add_argument(f"--{prefix}hang-rate", type=float, default=0.0, help="share that stall for --hang-seconds")
+    parser.add_argument(f"--{prefix}hang-seconds", type=float, default=60.0)
+    parser.add_argument(f"--{prefix}seed", type=int, default=None)
+
+
+def options_from(args: argparse.Namespace, prefix: str = "") -> MockOptions:
+    key = prefix.replace("-", "_")
+    return MockOptions(
+        latency=getattr(args, f"{key}latency"),
+        latency_ms=getattr(args, f"{key}latency_ms"),
+        jitter_ms=getattr(args, f"{key}jitter_ms"),
+        chunk_delay_ms=getattr(args, f"{key}chunk_delay_ms"),
+        lines=getattr(args, f"{key}lines"),
+        error_rate=getattr(args, f"{key}error_rate"),
+        rate_limit_rate=getattr(args, f"{key}rate_limit_rate"),
+        hang_rate=getattr(args, f"{key}hang_rate"),
+        hang_seconds=getattr(args, f"{key}hang_seconds"),
+        seed=getattr(args, f"{key}seed"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server = serve(args.host, args.port, options_from(args))
+    print(f"mock LLM listening on http://{args.host}:{args.port}/api/v3")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
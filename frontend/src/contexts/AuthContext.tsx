@@ -1,4 +1,5 @@
 import React, { createContext, useContext, useEffect, useMemo, useState } from "react";
+import { setSessionToken } from "../services/api";
 import type { User } from "../services/api";
 
 interface AuthContextValue {
@@ -28,6 +29,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
       window.localStorage.setItem(STORAGE_KEY, JSON.stringify(user));
     } else {
       window.localStorage.removeItem(STORAGE_KEY);
+      setSessionToken(null);
     }
   }, [user]);
 
@@ -38,6 +38,7 @@ const defaultQuestionForm: QuestionUpsertPayload = {
   explanation: "",
   common_mistakes: "",
   advanced_insights: "",
+  test_cases: "",
 };
 
 const AdminDashboard: React.FC = () => {
@@ -61,7 +62,7 @@ const AdminDashboard: React.FC = () => {
     Promise.all([adminListUsers(), adminListQuestions(), listChapters()])
       .then(([usersRes, questionRes, chapterRes]) => {
         setUsers(usersRes.data);
-        setQuestions(questionRes.data);
+        setQuestions(questionRes);
         setChapters(chapterRes.data);
       })
       .catch((err) => setError(err.message));
@@ -81,7 +82,7 @@ const AdminDashboard: React.FC = () => {
       return;
     }
     const [questionRes, chapterRes] = await Promise.all([adminListQuestions(), listChapters()]);
-    setQuestions(questionRes.data);
+    setQuestions(questionRes);
     setChapters(chapterRes.data);
   };
 
@@ -120,6 +121,7 @@ const AdminDashboard: React.FC = () => {
         explanation: questionForm.explanation || undefined,
         common_mistakes: questionForm.common_mistakes || undefined,
         advanced_insights: questionForm.advanced_insights || undefined,
+        test_cases: questionForm.test_cases || undefined,
       };
       await adminUpsertQuestion(payload);
       setMessage("题目已保存。");
@@ -357,6 +359,13 @@ const AdminDashboard: React.FC = () => {
               }
             />
           </label>
+          <label>
+            测试用例（可选，每个代码块是一组标准输入；留空则保留原有用例）
+            <textarea
+              value={questionForm.test_cases ?? ""}
+              onChange={(event) => setQuestionForm((prev) => ({ ...prev, test_cases: event.target.value }))}
+            />
+          </label>
           <button type="submit" disabled={submitting}>
             {submitting ? "保存中..." : "保存题目"}
           </button>
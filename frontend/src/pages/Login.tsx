@@ -1,7 +1,7 @@
 import React, { useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "../contexts/AuthContext";
-import { login, register } from "../services/api";
+import { login, register, setSessionToken } from "../services/api";
 import { useModal } from "../contexts/ModalContext";
 import "../styles/login.css";
 
@@ -31,6 +31,7 @@ const Login: React.FC = () => {
       } else {
         const { deviceName, browser } = getDeviceInfo();
         const res = await login(username, password, deviceName, browser);
+        setSessionToken(res.data.token);
         setUser(res.data.user);
         navigate("/tutorial");
       }
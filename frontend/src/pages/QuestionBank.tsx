@@ -6,17 +6,15 @@ import { useModal } from "../contexts/ModalContext";
 import {
   executeCode,
   getQuestion,
-  judgeAnswer,
   listChapters,
-  listQuestions,
+  listQuestionSummaries,
   recordProgress,
+  submitAnswer,
 } from "../services/api";
-import type { Chapter, ExecutionResult, Question } from "../services/api";
+import type { Chapter, ExecutionResult, Question, QuestionSummary } from "../services/api";
 import { useAuth } from "../contexts/AuthContext";
 import "../styles/question-bank.css";
 
-const SYSTEM_PROMPT = `你是一名耐心的 Python 新手导师，需要根据题目要求判断学习者提交的代码是否完全满足题意。请逐步指出：\n1. 代码是否满足功能需求；\n2. 若不满足，请列出问题，并给出修改建议；\n3. 若满足，说明通过原因。\n请使用中文分步说明。`;
-
 const difficultyBadges: Record<string, string> = {
   基础: "difficulty-badge difficulty-badge--easy",
   进阶: "difficulty-badge difficulty-badge--medium",
@@ -57,9 +55,12 @@ const QuestionBank: React.FC = () => {
   const selectedDifficulty = searchParams.get("difficulty") ?? "";
 
   const [chapters, setChapters] = useState<Chapter[]>([]);
-  const [questions, setQuestions] = useState<Question[]>([]);
+  const [questions, setQuestions] = useState<QuestionSummary[]>([]);
   const [detailQuestion, setDetailQuestion] = useState<Question | null>(null);
   const [loadingList, setLoadingList] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const listRequest = useRef(0);
   const [listError, setListError] = useState<string | null>(null);
 
   const [codeMap, setCodeMap] = useState<Record<string, string>>({});
@@ -80,19 +81,42 @@ const QuestionBank: React.FC = () => {
   }, []);
 
   useEffect(() => {
+    const request = ++listRequest.current;
     setLoadingList(true);
-    listQuestions({
+    setNextCursor(null);
+    listQuestionSummaries({
       chapter: selectedChapter || undefined,
       difficulty: selectedDifficulty || undefined,
     })
-      .then((res) => {
-        setQuestions(res.data);
+      .then(({ items, nextCursor: cursor }) => {
+        if (request !== listRequest.current) return;
+        setQuestions(items);
+        setNextCursor(cursor);
         setListError(null);
       })
       .catch((err) => setListError(err.message))
       .finally(() => setLoadingList(false));
   }, [selectedChapter, selectedDifficulty]);
 
+  const loadMoreQuestions = () => {
+    if (!nextCursor) return;
+    const request = listRequest.current;
+    setLoadingMore(true);
+    listQuestionSummaries({
+      chapter: selectedChapter || undefined,
+      difficulty: selectedDifficulty || undefined,
+      cursor: nextCursor,
+    })
+      .then(({ items, nextCursor: cursor }) => {
+        // A filter change while this page loaded starts a new list; drop the stale page.
+        if (request !== listRequest.current) return;
+        setQuestions((prev) => [...prev, ...items]);
+        setNextCursor(cursor);
+      })
+      .catch((err) => setListError(err.message))
+      .finally(() => setLoadingMore(false));
+  };
+
   useEffect(() => {
     return () => {
       Object.values(celebrationTimers.current).forEach((timer) => window.clearTimeout(timer));
@@ -104,15 +128,10 @@ const QuestionBank: React.FC = () => {
       setDetailQuestion(null);
       return;
     }
-    const existing = questions.find((question) => question.slug === slug);
-    if (existing) {
-      setDetailQuestion(existing);
-      return;
-    }
     getQuestion(slug)
       .then((res) => setDetailQuestion(res.data))
       .catch(() => setListError("未找到该题目"));
-  }, [slug, questions]);
+  }, [slug]);
 
   const triggerCelebration = (questionSlug: string) => {
     setCelebrationMap((prev) => ({ ...prev, [questionSlug]: true }));
@@ -189,12 +208,7 @@ const QuestionBank: React.FC = () => {
 
     updateJudgeState(question.slug, { loading: true, error: null, feedback: [], passed: null });
     try {
-      const payload = {
-        question: question.prompt,
-        reference: question.answer ?? "",
-        user_code: code,
-      };
-      const response = await judgeAnswer(SYSTEM_PROMPT, JSON.stringify(payload));
+      const response = await submitAnswer(question.slug, code);
       const { passed, feedback_steps } = response.data;
       updateJudgeState(question.slug, {
         loading: false,
@@ -219,9 +233,15 @@ const QuestionBank: React.FC = () => {
       openModal({ title: "提示", content: <p>请先选择一个选项再提交。</p> });
       return;
     }
-    const correctAnswer = (question.answer || "").trim();
-    const normalized = question.type === "单选题" ? selected.toUpperCase() : selected;
-    const isCorrect = normalized === correctAnswer;
+    let isCorrect: boolean;
+    try {
+      const response = await submitAnswer(question.slug, selected);
+      isCorrect = response.data.passed;
+    } catch (error: any) {
+      const detail = error?.response?.data?.detail || error.message;
+      openModal({ title: "提交失败", content: <p>{detail}</p> });
+      return;
+    }
     if (isCorrect) {
       triggerCelebration(question.slug);
     }
@@ -250,7 +270,7 @@ const QuestionBank: React.FC = () => {
     setSearchParams(params, { replace: true });
   };
 
-  const handleCardClick = (question: Question) => {
+  const handleCardClick = (question: QuestionSummary) => {
     const params = searchParams.toString();
     const suffix = params ? `?${params}` : "";
     navigate(`/questions/${question.slug}${suffix}`);
@@ -470,7 +490,7 @@ const QuestionBank: React.FC = () => {
         </div>
         <p className="question-bank__summary">
           当前筛选：{selectedChapter ? chapters.find((c) => c.slug === selectedChapter)?.title ?? selectedChapter : "全部章节"}
-          · {selectedDifficulty || "全部难度"} · 共 {questions.length} 道题
+          · {selectedDifficulty || "全部难度"} · {nextCursor ? `已加载 ${questions.length} 道题` : `共 ${questions.length} 道题`}
         </p>
       </header>
 
@@ -493,7 +513,7 @@ const QuestionBank: React.FC = () => {
             >
               <header>
                 <div className="question-card__heading">
-                  <h3>{question.title || getExcerpt(question.prompt)}</h3>
+                  <h3>{question.title || question.excerpt}</h3>
                   <span className={badgeClass}>{question.difficulty}</span>
                 </div>
                 <div className="question-card__meta">
@@ -501,7 +521,7 @@ const QuestionBank: React.FC = () => {
                   <span>题型：{question.type}</span>
                 </div>
               </header>
-              <p className="question-card__excerpt">{getExcerpt(question.prompt)}</p>
+              <p className="question-card__excerpt">{question.excerpt}</p>
               <footer>
                 <Link
                   to={`/tutorial/${question.chapter}`}
@@ -517,6 +537,11 @@ const QuestionBank: React.FC = () => {
         })}
         {!loadingList && !questions.length && <p>当前筛选暂无题目，试试其它章节或难度。</p>}
       </div>
+      {nextCursor && !loadingList && (
+        <button type="button" className="question-bank__more" onClick={loadMoreQuestions} disabled={loadingMore}>
+          {loadingMore ? "加载中..." : "加载更多"}
+        </button>
+      )}
     </section>
   );
 };
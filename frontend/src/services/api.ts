@@ -5,6 +5,26 @@ const client = axios.create({
   timeout: 10000,
 });
 
+const TOKEN_KEY = "python101-token";
+
+// The session token from /auth/login identifies the caller for quotas and the admin lane.
+export const setSessionToken = (token?: string | null) => {
+  if (typeof window === "undefined") return;
+  if (token) {
+    window.localStorage.setItem(TOKEN_KEY, token);
+  } else {
+    window.localStorage.removeItem(TOKEN_KEY);
+  }
+};
+
+client.interceptors.request.use((config) => {
+  const token = typeof window !== "undefined" ? window.localStorage.getItem(TOKEN_KEY) : null;
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+  return config;
+});
+
 export interface Device {
   name: string;
   browser: string;
@@ -48,6 +68,15 @@ export interface Question {
   advanced_insights?: string | null;
 }
 
+export interface QuestionSummary {
+  slug: string;
+  chapter: string;
+  difficulty: string;
+  type: string;
+  title?: string | null;
+  excerpt: string;
+}
+
 export interface QuestionOut {
   slug: string;
   chapter: string;
@@ -86,12 +115,31 @@ export interface QuestionUpsertPayload {
   explanation?: string | null;
   common_mistakes?: string | null;
   advanced_insights?: string | null;
+  test_cases?: string | null;
+}
+
+export interface SearchHit {
+  kind: "chapter" | "question";
+  slug: string;
+  title: string;
+  score: number;
+  snippet: string;
+  highlights: [number, number][];
 }
 
+export interface SearchResults {
+  query: string;
+  total: number;
+  offset: number;
+  limit: number;
+  hits: SearchHit[];
+}
 
 export interface JudgeResult {
   passed: boolean;
   feedback_steps: string[];
+  source?: "local" | "llm";
+  verdict?: string | null;
 }
 
 export interface ExecutionPayload {
@@ -117,7 +165,7 @@ export const login = (
   device_name: string,
   browser: string
 ) =>
-  client.post<{ user: User }>("/auth/login", {
+  client.post<{ user: User; token?: string | null }>("/auth/login", {
     username,
     password,
     device_name,
@@ -133,22 +181,59 @@ export const removeDevice = (
 export const listChapters = () => client.get<Chapter[]>("/content/chapters");
 export const getChapter = (slug: string) => client.get<Chapter>(`/content/chapters/${slug}`);
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+const getPage = <T>(url: string, params?: Record<string, unknown>) =>
+  client
+    .get<T[]>(url, { params })
+    .then((res): Page<T> => ({ items: res.data, nextCursor: (res.headers["x-next-cursor"] as string | undefined) ?? null }));
+
+// Question lists are paged; follow X-Next-Cursor until the last page.
+const getAllPages = async <T>(url: string, params?: Record<string, unknown>) => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await getPage<T>(url, { ...params, cursor, limit: 500 });
+    items.push(...page.items);
+    cursor = page.nextCursor ?? undefined;
+  } while (cursor);
+  return items;
+};
+
 export const listQuestions = (params?: { chapter?: string; difficulty?: string }) =>
-  client.get<Question[]>("/content/questions", { params });
+  getAllPages<Question>("/content/questions", params);
+
+export const listQuestionSummaries = (params?: {
+  chapter?: string;
+  difficulty?: string;
+  cursor?: string;
+  limit?: number;
+}) => getPage<QuestionSummary>("/content/questions", { ...params, fields: "summary" });
 
 export const getQuestion = (slug: string) => client.get<Question>(`/content/questions/${slug}`);
 
+export const searchContent = (params: {
+  q: string;
+  kind?: "chapter" | "question";
+  limit?: number;
+  offset?: number;
+}) => client.get<SearchResults>("/content/search", { params });
+
 export const recordProgress = (username: string, question_slug: string, score: number) =>
   client.post<{ user: User }>("/progress/record", { username, question_slug, score });
 
-export const judgeAnswer = (system_prompt: string, prompt: string) =>
-  client.post<JudgeResult>("/judge/evaluate", { system_prompt, prompt });
+// Judged on the server: locally for objective questions and 编程题 with a reference, else by the model.
+export const submitAnswer = (question_slug: string, answer: string) =>
+  client.post<JudgeResult>("/judge/submit", { question_slug, answer });
 
 export const executeCode = (payload: ExecutionPayload) =>
   client.post<ExecutionResult>("/execute/run", payload);
 
 export const adminListUsers = () => client.get<User[]>("/admin/users");
-export const adminListQuestions = () => client.get<Question[]>("/admin/questions");
+export const adminListQuestions = () => getAllPages<Question>("/admin/questions");
 export const adminUpsertChapter = (payload: ChapterUpsertPayload) =>
   client.post<Chapter>("/admin/chapters", payload);
 export const adminUpsertQuestion = (payload: QuestionUpsertPayload) =>